@@ -65,8 +65,10 @@ export const uploadWidgetAsset = async (
     random_id: string,
     widget_type: string,
     field_name: string,
-    formData: FormData): Promise<any> => {
-    const resp = await axios.post<any>(`/upload-widget-assets/${random_id}/${widget_type}/${field_name}`, formData, {
+    formData: FormData,
+    mode?: "append"): Promise<any> => {
+    const url = `/upload-widget-assets/${random_id}/${widget_type}/${field_name}`
+    const resp = await axios.post<any>(mode ? `${url}?mode=${mode}` : url, formData, {
         headers: {
             "Content-Type": "multipart/form-data",
         }
@@ -83,6 +85,7 @@ export const urlFor = (path: string): string => {
     return urlPrefix + "/" + path;
 }
 
-export const urlForWidgetAsset = (randomID:string, fieldName: string, path: string): string => {
-    return `${urlPrefix}/widget-asset/${randomID}/${fieldName}/${path}`
+export const urlForWidgetAsset = (randomID:string, fieldName: string, path: string, size?: "thumb" | "preview"): string => {
+    const url = `${urlPrefix}/widget-asset/${randomID}/${fieldName}/${path}`
+    return size ? `${url}?size=${size}` : url
 }
\ No newline at end of file
@@ -37,8 +37,20 @@ function ObjectsPicsWidget(props: Props) {
         formData.append("file[]", files[i])
       }
 
-      uploadWidgetAsset(props.randomID, 'objects_pics_widget', props.field_name, formData).then(data => {
-        props.updateFormValue(props.field_name, data);
+      // With pictures already saved the server only keeps the new ones, which are added to the first object,
+      // keeping the classification made so far
+      const objects = props.data || []
+      const hasPics = objects.some(obj => obj.pics.length > 0)
+      uploadWidgetAsset(props.randomID, 'objects_pics_widget', props.field_name, formData, hasPics ? "append" : undefined).then((data: Array<ObjectData>) => {
+        if (!hasPics) {
+          props.updateFormValue(props.field_name, data);
+          return
+        }
+        const known = new Set(objects.flatMap(obj => obj.pics.map(pic => pic.path)))
+        const added = data.flatMap(obj => obj.pics).filter(pic => !known.has(pic.path))
+        const merged = [...objects]
+        merged[0] = { ...merged[0], pics: [...merged[0].pics, ...added] }
+        props.updateFormValue(props.field_name, merged);
       })
     }
   }
@@ -253,7 +265,7 @@ function ObjectsPicsWidget(props: Props) {
                     onClick={() => { toggleSelected(objIndex, picIndex) }}
                     style={{ height: picSize + 'px' }}
                     className='ObjectsPicsImage'
-                    src={urlForWidgetAsset(props.randomID, props.field_name, item.path)} />
+                    src={urlForWidgetAsset(props.randomID, props.field_name, item.path, "thumb")} />
                   <div className="d-flex justify-content-center" >
                     <p className='ObjectsPicsImageCaption'>{item.path}</p>
                   </div>
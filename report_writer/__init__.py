@@ -1,11 +1,12 @@
 from pathlib import Path
+import hashlib
 import shutil
 from typing import Any, Iterator, Optional, Tuple,  Union, IO
-from report_writer.widgets.composite_widget import CompositeWidget
+from report_writer.form_schema import get_form_schema
 from report_writer.widgets import get_widget_class_by_widget_type
 from .doc_handler import DocxHandler
 from .html_render import render_pre_html
-from .types import ErrorsType, ExternalBrigdWasNotSet, FileType, ModelList, ModelListItem,  WidgetAttributesType
+from .types import ErrorsType, ExternalBrigdWasNotSet, FileType, ModelList, ModelListItem, RenderItem, RenderResult,  WidgetAttributesType
 import json
 import json
 import os
@@ -13,7 +14,13 @@ from report_writer.zipmodel import zip_folder, unzip_file
 import tempfile
 import markdown
 from datetime import timedelta, datetime
-from report_writer.module_model import ModuleModel
+from concurrent.futures import ProcessPoolExecutor
+from report_writer.module_model import ModuleModel, get_module_model, registry
+from report_writer.doc_handler.template_cache import load_template
+from report_writer.renditions import make_rendition, delete_renditions
+from report_writer.model_lists import load_list
+from report_writer.file_cache import FileCache
+from report_writer.profiling import RenderProfile, profile_phase
 
 __version__ = '0.1.14'
 
@@ -27,10 +34,17 @@ class Renderer:
     def pre(self, context):
         self.module_model.pre(context)
 
-    def render(self, context, dest_file: Union[Path, str], type_="docx") -> Tuple[Any, Optional[Path]]:
-        self.pre(context)
-        render_pre_html(self.module_model, context)
-        self.engine = DocxHandler(self.module_model)
+    def render(self, context, dest_file: Union[Path, str, IO[bytes]], type_="docx", profile: RenderProfile | None = None) -> Tuple[Any, Union[Path, IO[bytes], None]]:
+        """If a profile is passed the time and memory of each phase of the render are recorded on it"""
+        if profile is not None:
+            with profile.activate():
+                return self.render(context, dest_file, type_)
+        with profile_phase("pre"):
+            self.pre(context)
+        with profile_phase("render_pre_html"):
+            render_pre_html(self.module_model, context)
+        with profile_phase("docx_handler"):
+            self.engine = DocxHandler(self.module_model)
         return context, self.engine.render("Main.docx", context, dest_file)
 
 
@@ -88,7 +102,7 @@ class ReportWriter:
             raise Exception("validate was not called")
         return self._context
 
-    def set_random_id(self, value: str) -> None:
+    def set_random_id(self, value: str | None) -> None:
         self._random_id = value
 
     def set_tempfolder(self, folder: Path | str) -> None:
@@ -106,47 +120,55 @@ class ReportWriter:
         return folder
 
     def list_models(self) -> list[str]:
-        return [entry.name for entry in self.models_folder.iterdir() if entry.is_dir()]
+        return list(_models_cache.get(self.models_folder))
 
     def set_model(self, model_name: str) -> None:
         self._current_model_folder = (
             self.models_folder / model_name).absolute()
-        self._current_module_model = ModuleModel(
+        self._current_module_model = get_module_model(
             self.models_folder, model_name)
 
     def get_form_layout(self) -> list[list[WidgetAttributesType]]:
         """Return the layout description of the form in a json form"""
-        form = self.current_module_model.get_web_form()
-        form.set_report_writer(self)
-        form.define_widgets()
-        widgets = form.widgets
-        return [[w.get_layout() for w in row] for row in widgets]
+        return get_form_schema(self.current_module_model, self).get_layout(self)
+
+    def get_form_layout_json(self) -> Tuple[bytes, str]:
+        """Return the layout serialized to json and its hash. They are computed once for each
+        version of the model"""
+        module_model = self.current_module_model
+        cached = module_model.cache.get("form_layout_json")
+        if cached is None:
+            body = json.dumps(self.get_form_layout(), ensure_ascii=False).encode("utf-8")
+            cached = body, hashlib.sha1(body).hexdigest()
+            module_model.cache["form_layout_json"] = cached
+        return cached
 
     def get_default_data(self) -> dict[str, Any]:
-        form = self.current_module_model.get_web_form()
-        form.set_report_writer(self)
-        form.define_widgets()
-        data = {}
-        for row in form.widgets:
-            for w in row:
-                data[w.name] = w.get_default_data()
-        return data
+        return get_form_schema(self.current_module_model, self).get_default_data(self)
 
-    def render_docx(self, dest_file: str | Path) -> Tuple[Any, Optional[Path]]:
-        """Render the docx document in the path specified on dest_file param
+    def render_docx(self, dest_file: str | Path | IO[bytes], profile: RenderProfile | None = None) -> Tuple[Any, Path | IO[bytes] | None]:
+        """Render the docx document in the path specified on dest_file param. dest_file can also be
+        a writable binary stream, in that case nothing is written to disk. The time and peak memory
+        of each phase are recorded on profile if one is passed.
         Returns a tuple (context, file_renderized)"""
         r = Renderer(self.current_module_model)
-        return r.render(self.context, dest_file)
+        return r.render(self.context, dest_file, profile=profile)
+
+    def render_many(self, items: list[RenderItem], workers: int | None = None) -> list[RenderResult]:
+        """Validate and render many documents of the current model using a pool of processes.
+        If workers is None the number of processors of the machine is used.
+        Returns a result for each item in the same order of items"""
+        initargs = (self.models_folder, self.current_module_model.model_name, self._tempfolder, self._random_id)
+        if workers == 1:
+            _init_render_worker(*initargs)
+            return [_render_item(item) for item in items]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker, initargs=initargs) as executor:
+            return list(executor.map(_render_item, items))
 
     def validate(self,  data: dict) -> ErrorsType:
         """Receive data serialized, validate and convert types
         Returns errors"""
-        form = self.current_module_model.get_web_form()
-        form.set_report_writer(self)
-        form.define_widgets()
-        widgets = form.widgets
-        composite = CompositeWidget(widgets)
-        self._context, errors = composite.convert_data(data)
+        self._context, errors = get_form_schema(self.current_module_model, self).convert_data(self, data)
         return errors
 
     def save_data_to_file(self, data: dict, path: str | Path) -> None:
@@ -161,23 +183,15 @@ class ReportWriter:
         return data
 
     def get_list(self, list_name: str) -> list[ModelListItem]:
-        folder = self.current_model_folder / "lists"
-        path = folder / f"{list_name}.txt"
-        if not path.exists():
-            path = folder / f"{list_name}.json"
-            if not path.exists():
-                return []
-
-        items: list[ModelListItem] = []
-        if path.suffix == ".txt":
-            text = path.read_text(encoding="utf-8").strip()
-            lines = text.split("\n")
-            items = [{'key': line, 'value': line}
-                     for line in lines]
-        elif path.suffix == ".json":
-            with path.open("r", encoding="utf-8") as f:
-                items = json.load(f)
-        return items
+        """Items of the list, the same list object is returned while the file doesn't change
+        so it must not be modified"""
+        parsed = load_list(self.current_model_folder / "lists", list_name)
+        return parsed.items if parsed else []
+
+    def get_list_map(self, list_name: str) -> dict[str, ModelListItem]:
+        """Items of the list by key"""
+        parsed = load_list(self.current_model_folder / "lists", list_name)
+        return parsed.by_key if parsed else {}
 
     def get_lists(self) -> list[ModelList]:
         folder = self.current_model_folder / "lists"
@@ -220,6 +234,7 @@ class ReportWriter:
         if folder.exists() and not overwrite:
             raise FileExistsError(f"Model \"{filename}\" already exists")
         unzip_file(zipfile, folder)
+        registry.invalidate(self.models_folder, filename)
         self.fix_imports()
 
     def delete_model(self, model_name: str) -> None:
@@ -227,27 +242,27 @@ class ReportWriter:
         folder = self.models_folder / model_name
         try:
             shutil.rmtree(folder)
+            registry.invalidate(self.models_folder, model_name)
             self.fix_imports()
         except FileNotFoundError:
             raise Exception("model not found")
 
-    def save_widget_assets(self, widget_type: str, field_name: str, files: list[FileType]) -> Any:
+    def save_widget_assets(self, widget_type: str, field_name: str, files: list[FileType], append: bool = False) -> Any:
+        """Saves files uploaded to a widget. By default the previous files of the widget are replaced,
+        with append=True the files are added to the existing ones"""
         class_ = get_widget_class_by_widget_type(widget_type)
-        return class_.save_widget_assets(self.get_widget_assets_folder(field_name), files)
+        return class_.save_widget_assets(self.get_widget_assets_folder(field_name), files, append=append)
 
     def get_update_data(self, field_name: str, payload: Any) -> Any:
-        form = self.current_module_model.get_web_form()
-        form.set_report_writer(self)
-        form.define_widgets()
-        w = form.get_widget(field_name)
-        return w.get_update_data(payload)
+        return get_form_schema(self.current_module_model, self).get_update_data(self, field_name, payload)
 
     def get_instructions_html(self) -> str:
         """Get the instructions especified in instructions.md in model folder"""
-        path = self.current_model_folder / "instructions.md"
-        if path.exists():
-            return markdown.markdown(path.read_text(encoding="utf-8"))
-        return ""
+        cache = self.current_module_model.cache
+        if "instructions_html" not in cache:
+            path = self.current_model_folder / "instructions.md"
+            cache["instructions_html"] = markdown.markdown(path.read_text(encoding="utf-8")) if path.exists() else ""
+        return cache["instructions_html"]
 
     # def save_widget_asset(self, file: str | Path | IO[bytes], filename: str, field_name: str, overwrite=False) -> None:
     #     """Save an file asset to the widget temp folder"""
@@ -279,19 +294,24 @@ class ReportWriter:
                 pass
         return folder
 
-    def get_widget_asset(self, field_name: str, relpath: str) -> Path | None:
-        """Returns an asset path associated with a widget by it's relative path"""
+    def get_widget_asset(self, field_name: str, relpath: str, size: str | None = None) -> Path | None:
+        """Returns an asset path associated with a widget by it's relative path. If size is passed
+        ("thumb" or "preview") the path of the reduced version of the picture is returned, it is
+        created if it wasn't created yet on upload"""
         path = self.get_widget_assets_folder(field_name) / relpath
         print(path)
-        if path.exists():
-            return path
-        return None
+        if not path.exists():
+            return None
+        if size is not None:
+            return make_rendition(path, size) or path
+        return path
 
     def delete_widget_asset(self, field_name: str, relpath: str) -> None:
         """Returns an asset path associated with a widget by it's relative path"""
         path = self.get_widget_assets_folder(field_name) / relpath
         if path.exists():
             path.unlink()
+            delete_renditions(path)
 
     def get_widget_assets(self, field_name: str, subfolder: str | None = None) -> Iterator[Path] | None:
         """Returns an iterator to the assets associated with a widget"""
@@ -318,8 +338,57 @@ class ReportWriter:
                 entry.unlink()
 
 
+_worker_report_writer: ReportWriter | None = None
+# random_id given to render_many, used by the items that don't have their own
+_worker_random_id: str | None = None
+
+
+def _init_render_worker(models_folder: Path, model_name: str, tempfolder: Path | None, random_id: str | None) -> None:
+    """Loads the model and parses its templates once for each process of render_many"""
+    global _worker_report_writer, _worker_random_id
+    _worker_random_id = random_id
+    _worker_report_writer = ReportWriter(models_folder, tempfolder=tempfolder, random_id=random_id, model_name=model_name)
+    folder = _worker_report_writer.current_module_model.docx_templates_folder
+    if folder.is_dir():
+        for path in folder.glob("*.docx"):
+            if not path.name.startswith("~$"):
+                load_template(path)
+
+
+def _render_item(item: RenderItem) -> RenderResult:
+    if _worker_report_writer is None:
+        raise Exception("render worker was not initialized")
+    rw = _worker_report_writer
+    result: RenderResult = {'dest_file': str(item['dest_file']), 'errors': None, 'exception': None, 'profile': None}
+    profile = RenderProfile() if item.get('profile') else None
+    try:
+        # Workers are reused, an item must not keep the folder of the previous one
+        rw.set_random_id(item.get('random_id', _worker_random_id))
+        result['errors'] = rw.validate(item['data'])
+        if not result['errors']:
+            rw.render_docx(item['dest_file'], profile=profile)
+    except Exception as e:
+        result['exception'] = f"{type(e).__name__}: {e}"
+    if profile is not None and profile.phases:
+        # Also when the render fails, the last phase shows where
+        result['profile'] = profile.to_list()
+    return result
+
+
+def _read_json_file(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _list_model_folders(folder: Path) -> list[str]:
+    return [entry.name for entry in folder.iterdir() if entry.is_dir()]
+
+
+# The mtime of a folder changes when an entry is added, removed or renamed
+_models_cache: FileCache[list[str]] = FileCache(_list_model_folders, maxsize=16)
+_file_names_cache: FileCache[dict[str, str]] = FileCache(_read_json_file, maxsize=4)
+
+
 def get_file_names() -> dict[str, str]:
     folder = script_dir / "api/static/front"
-    with (folder / "filenames.json").open("r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data
+    return dict(_file_names_cache.get(folder / "filenames.json"))
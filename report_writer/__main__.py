@@ -6,7 +6,8 @@ from report_writer.copy_spa import copy_spa
 import os
 import subprocess
 import json
-from report_writer.api.helpers import reacreate_db, ReportWriter
+from report_writer.api.helpers import reacreate_db, sync_db, ReportWriter
+from report_writer.profiling import RenderProfile
 import sys
 
 script_dir =  Path(os.path.dirname(os.path.realpath(__file__)))
@@ -16,7 +17,11 @@ subparsers = parser.add_subparsers(dest="command", required=True, help='Command
 parser.add_argument("-v", "--verbose", help="Verbose")
 
 p_dev = subparsers.add_parser("dev")
-p_dev.add_argument("--no-build-db", action="store_true", help="Do not recreate the dev db")
+p_dev.add_argument("--no-build-db", action="store_true", help="Do not update the lists of the dev db")
+p_dev.add_argument("--rebuild-db", action="store_true", help="Recreate the dev db instead of updating the lists that changed")
+
+p_sync_lists = subparsers.add_parser("sync-lists", help="Load the lists that changed into the db")
+p_sync_lists.add_argument("--full", action="store_true", help="Recreate the db and load every list")
 
 p_copy_spa = subparsers.add_parser("copy-spa")
 p_copy_spa.add_argument("folder_to")
@@ -36,11 +41,23 @@ p_import_model.add_argument("zipfile")
 p_delete_model = subparsers.add_parser("delete-model")
 p_delete_model.add_argument("model_name")
 
+p_render = subparsers.add_parser("render", help="Render a document from the data of the form saved in a json file")
+p_render.add_argument("model_name")
+p_render.add_argument("data_file")
+p_render.add_argument("dest_file")
+p_render.add_argument("--random-id", help="Id of the folder with the files uploaded to the widgets")
+p_render.add_argument("--profile", action="store_true", help="Print the time and peak memory of each phase of the render")
+
 args = parser.parse_args()
 if args.command == "dev":
-    if not args.no_build_db:
+    if args.rebuild_db:
+        reacreate_db()
+    run_app(sync_lists=not args.no_build_db and not args.rebuild_db)
+elif args.command == "sync-lists":
+    if args.full:
         reacreate_db()
-    run_app()
+    else:
+        sync_db()
 elif args.command == "copy-spa":
     copy_spa(args.folder_to)
 elif args.command == "build-spa":
@@ -81,6 +98,16 @@ elif args.command == "import-model":
 elif args.command == "delete-model":
     rw = ReportWriter("./models")
     rw.delete_model(args.model_name)
+elif args.command == "render":
+    rw = ReportWriter("./models", model_name=args.model_name, random_id=args.random_id, tempfolder=config.TEMPFOLDER)
+    errors = rw.validate(rw.load_data_from_file(args.data_file))
+    if errors:
+        print(json.dumps(errors, ensure_ascii=False, indent=4))
+        sys.exit(1)
+    profile = RenderProfile() if args.profile else None
+    rw.render_docx(args.dest_file, profile=profile)
+    if profile is not None:
+        print(profile.format())
 
 
 
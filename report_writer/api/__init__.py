@@ -1,5 +1,8 @@
 from .app import app
 from . import config
 
-def run_app():
+def run_app(sync_lists: bool | None = None):
+    if config.SYNC_LISTS_ON_STARTUP if sync_lists is None else sync_lists:
+        from .helpers import sync_db
+        sync_db()
     app.run(host='0.0.0.0', port=5000, debug=config.DEBUG)
\ No newline at end of file
@@ -1,13 +1,38 @@
+import hashlib
+import io
+import json
+import re
 from pathlib import Path
 from typing import IO
-from flask import Flask, jsonify, request, abort, render_template, send_from_directory
+from flask import Flask, jsonify, request, abort, render_template, send_file, send_from_directory
 from report_writer import ReportWriter, get_file_names
 from report_writer.api import config
-from report_writer.api.database import repo
-from report_writer.types import FileType, ModelNotFoundError
+from report_writer.api.database import db, repo
+from report_writer.api.jobs import JobManager, RenderJob
+from report_writer.types import FileType, ModelNotFoundError, ValidationError
+from report_writer.renditions import RenditionNotFoundError
+from report_writer.profiling import RenderProfile
 
 
+DOCX_MIMETYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
 app = Flask(__name__)
+jobs = JobManager(config.RENDER_WORKERS, config.RENDER_JOBS_TTL)
+
+
+@app.teardown_appcontext
+def remove_db_session(exception=None):
+    # Returns the connection of the request thread to the pool
+    db.session.remove()
+
+
+def conditional_json(body: bytes, etag: str):
+    """Json response the browser keeps but revalidates on each use, answering 304 when the
+    etag sent in If-None-Match is still valid"""
+    response = app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 
 @app.route("/")
@@ -17,7 +42,11 @@ def index():
     rw = ReportWriter("./models")
     models = rw.list_models()
     random_id = "RG123_2021"
-    return render_template('base.html', model_name=model_name, filenames=filenames, models=models, random_id=random_id)
+    html = render_template('base.html', model_name=model_name, filenames=filenames, models=models, random_id=random_id)
+    response = app.response_class(html, mimetype="text/html")
+    response.set_etag(hashlib.sha1(html.encode("utf-8")).hexdigest())
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 
 @app.route("/api/form-layout/<model_name>")
@@ -29,8 +58,8 @@ def form_layout(model_name: str):
         rw.set_model(model_name)
     except ModelNotFoundError:
         abort(404)
-    layout = rw.get_form_layout()
-    return jsonify(layout)
+    body, etag = rw.get_form_layout_json()
+    return conditional_json(body, etag)
 
 
 @app.route("/api/form-default-data/<random_id>/<model_name>")
@@ -38,8 +67,8 @@ def form_default_data(random_id: str, model_name: str):
     if not model_name:
         abort(404)
     rw = ReportWriter("./models", random_id=random_id, model_name=model_name, tempfolder=config.TEMPFOLDER)
-    data = rw.get_default_data()
-    return jsonify(data)
+    body = json.dumps(rw.get_default_data(), ensure_ascii=False).encode("utf-8")
+    return conditional_json(body, hashlib.sha1(body).hexdigest())
 
 
 @app.route("/api/render-doc/<model_name>/<random_id>", methods=("POST",))
@@ -58,36 +87,108 @@ def render_doc(model_name: str, random_id: str):
         return jsonify(errors), 422
     print("\n\nContext: ")
     print(rw.context)
-    path = Path("./compilado.docx").absolute()
-    rw.render_docx(path)
-    return send_from_directory(path.parent, path.name)
+    buffer = io.BytesIO()
+    rw.render_docx(buffer)
+    buffer.seek(0)
+    return send_file(buffer, mimetype=DOCX_MIMETYPE, download_name="compilado.docx")
     # return jsonify(errors)
 
 
+@app.route("/api/render-jobs/<model_name>/<random_id>", methods=("POST",))
+def submit_render_job(model_name: str, random_id: str):
+    if not model_name:
+        abort(404)
+    try:
+        rw = ReportWriter("./models", random_id=random_id, model_name=model_name, tempfolder=config.TEMPFOLDER)
+    except ModelNotFoundError:
+        abort(404)
+    json_data = request.json
+    if not isinstance(json_data, dict):
+        return "Incorrect data format", 401
+    errors = rw.validate(json_data)
+    if errors:
+        return jsonify(errors), 422
+    folder = config.TEMPFOLDER / random_id / "renders"
+    folder.mkdir(parents=True, exist_ok=True)
+
+    profile_requested = bool(request.args.get("profile"))
+
+    def render(job: RenderJob) -> None:
+        job.set_phase("rendering")
+        # The phases of the profile are also used to show where the render is, memory is only
+        # traced when the profile was requested
+        profile = RenderProfile(memory=profile_requested,
+                                on_phase=lambda name: job.set_phase(f"rendering:{name}" if name else "rendering"))
+        try:
+            rw.render_docx(job.dest_file, profile=profile)
+        finally:
+            if profile_requested:
+                job.profile = profile.to_list()
+
+    job = jobs.submit(folder, render)
+    return jsonify(job.to_dict()), 202
+
+
+@app.route("/api/render-jobs/<job_id>")
+def render_job_status(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        return "job not found", 404
+    return jsonify(job.to_dict())
+
+
+@app.route("/api/render-jobs/<job_id>/file")
+def render_job_file(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        return "job not found", 404
+    if job.status != 'done':
+        return jsonify(job.to_dict()), 409
+    return send_from_directory(job.dest_file.parent, job.dest_file.name, as_attachment=True, download_name="compilado.docx")
+
+
 @app.route("/api/list-items/<model_name>/<list_name>")
 def list_items(model_name: str, list_name: str):
     q = request.args.get("query", default="")
-    items = repo.search_list_items(model_name, list_name, q, limit=50)
-    its = [{'key': item.key, 'value': item.value}
-           for item in items] if items else []
-    return jsonify(its)
+    if request.args.get("mode") == "regex":
+        try:
+            return jsonify(repo.search_list_items_regexp(model_name, list_name, q, limit=50))
+        except re.error as e:
+            return jsonify(f"Expressão regular inválida: {e}"), 400
+    return jsonify(repo.search_list_items(model_name, list_name, q, limit=50))
 
 
 @app.route("/api/model-instructions/<model_name>")
 def model_instructions(model_name: str):
-    rw = ReportWriter("./models", model_name=model_name)
-    return jsonify({
-        "html": rw.get_instructions_html()
-    })
+    try:
+        rw = ReportWriter("./models", model_name=model_name)
+    except ModelNotFoundError:
+        abort(404)
+    cache = rw.current_module_model.cache
+    if "instructions_json" not in cache:
+        body = json.dumps({"html": rw.get_instructions_html()}, ensure_ascii=False).encode("utf-8")
+        cache["instructions_json"] = body, hashlib.sha1(body).hexdigest()
+    return conditional_json(*cache["instructions_json"])
 
 
 @app.route("/api/widget-asset/<random_id>/<field_name>/<path:relpath>")
 def widget_asset(random_id: str, field_name: str, relpath: str):
     rw = ReportWriter("./models", random_id=random_id, tempfolder=config.TEMPFOLDER)
-    path = rw.get_widget_asset(field_name, relpath)
+    try:
+        path = rw.get_widget_asset(field_name, relpath, size=request.args.get("size"))
+    except RenditionNotFoundError:
+        abort(400)
     if path is None:
         return "file not found", 404
-    return send_from_directory(path.parent, path.name)
+    # ETag and Last-Modified come from the file, so unchanged pictures are answered with 304. The
+    # browser revalidates on each use since a picture can be replaced by another with the same
+    # name, and shared caches must not keep the pictures of a case
+    response = send_from_directory(path.parent, path.name, etag=True, conditional=True)
+    response.cache_control.public = False
+    response.cache_control.max_age = None
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
 
 @app.route("/api/widget-asset/<random_id>/<field_name>/<path:relpath>", methods=("DELETE",))
@@ -105,7 +206,10 @@ def upload_widget_assets(random_id: str, widget_type: str, field_name: str):
     rw = ReportWriter("./models", random_id=random_id, tempfolder=config.TEMPFOLDER)
     files = request.files.getlist("file[]")
     files_ = [FileType(f.stream, str(f.filename)) for f in files]
-    data = rw.save_widget_assets(widget_type, field_name, files_)
+    try:
+        data = rw.save_widget_assets(widget_type, field_name, files_, append=request.args.get("mode") == "append")
+    except ValidationError as e:
+        return jsonify(str(e)), 422
     return jsonify(data)
 
 
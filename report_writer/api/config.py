@@ -1,6 +1,7 @@
 from pathlib import Path
 import os
 import tempfile
+from datetime import timedelta
 
 api_dir = Path(os.path.dirname(os.path.realpath(__file__)))
 
@@ -10,5 +11,22 @@ if not TEMPFOLDER.exists():
 
 DEBUG = True
 
+# Number of documents rendered at the same time by the render jobs api
+RENDER_WORKERS = 2
+# Time a finished render job and its file are kept
+RENDER_JOBS_TTL = timedelta(hours=1)
+
+# Loads the lists that changed into the database when the api starts
+SYNC_LISTS_ON_STARTUP = True
+
 DBFILE = TEMPFOLDER / 'db.db'
-DATABASE_URI = f"sqlite:///{DBFILE}"
\ No newline at end of file
+DATABASE_URI = f"sqlite:///{DBFILE}"
+# With WAL the typeahead searches are not blocked while the lists are synchronized
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,  # KiB
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,  # ms a writer waits for another writer
+}
+DATABASE_POOL_SIZE = 5
\ No newline at end of file
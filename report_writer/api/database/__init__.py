@@ -1,4 +1,4 @@
 from report_writer.api import config
 from .db import DB
 
-db = DB(config.DATABASE_URI)
\ No newline at end of file
+db = DB(config.DATABASE_URI, pragmas=config.SQLITE_PRAGMAS, pool_size=config.DATABASE_POOL_SIZE)
\ No newline at end of file
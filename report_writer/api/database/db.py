@@ -1,16 +1,32 @@
-from sqlalchemy import create_engine, event, engine
+from sqlalchemy import create_engine, event, engine, exc, text
 from sqlalchemy.engine.base import Engine
 from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from functools import lru_cache
 import re
-from typing import Tuple
+from typing import Any, Tuple
 from pathlib import Path
 from typing import Union
 
 
+@lru_cache(maxsize=256)
+def compile_regexp(expr: str) -> re.Pattern:
+    return re.compile(expr, re.I)
+
+
+def sqlite_regexp(expr, item):
+    if item is None:
+        return False
+    return compile_regexp(expr).search(item) is not None
+
+
 class DB(object):
-    def __init__(self, uri: str) -> None:
+    def __init__(self, uri: str, pragmas: dict[str, Any] | None = None, pool_size: int = 5) -> None:
         self.database_uri: str = uri
         self.database_type: str = uri.split(":")[0]
+        # Executed on each new sqlite connection (journal_mode, synchronous, cache_size...)
+        self.pragmas: dict[str, Any] = pragmas or {}
+        self.pool_size = pool_size
         engine, session = self.connect()
         self.session: scoped_session = session
         self.engine: Engine = engine
@@ -25,18 +41,29 @@ class DB(object):
 
 
     def connect(self) -> Tuple[Engine, scoped_session]:
+        options: dict[str, Any] = {}
+        if self.database_type == 'sqlite' and ":memory:" not in self.database_uri and self.database_uri != "sqlite://":
+            # sqlalchemy opens a new connection for each session of a sqlite file by default, a
+            # pool keeps the connections with their pragmas and functions. Connections are used
+            # by one thread at a time but not always by the thread that created them
+            options = {
+                'poolclass': QueuePool,
+                'pool_size': self.pool_size,
+                'connect_args': {'check_same_thread': False}
+            }
         self.engine = create_engine(
-            self.database_uri, convert_unicode=True, encoding="utf-8")
+            self.database_uri, convert_unicode=True, encoding="utf-8", **options)
         if self.database_type == 'sqlite':
-            def sqlite_regexp(expr, item):
-                if item is None:
-                    return False
-                reg = re.compile(expr, re.I)
-                return reg.search(item) is not None
-
-            @event.listens_for(self.engine, "begin")
-            def do_begin(conn):
-                conn.connection.create_function('regexp', 2, sqlite_regexp)
+            pragmas = self.pragmas
+
+            @event.listens_for(self.engine, "connect")
+            def do_connect(dbapi_connection, connection_record):
+                # Once for each connection of the pool instead of at each transaction
+                dbapi_connection.create_function('regexp', 2, sqlite_regexp, deterministic=True)
+                cursor = dbapi_connection.cursor()
+                for name, value in pragmas.items():
+                    cursor.execute(f"PRAGMA {name} = {value}")
+                cursor.close()
         self.session = scoped_session(sessionmaker(autocommit=False,
                                                    autoflush=False,
                                                    bind=self.engine))
@@ -45,4 +72,28 @@ class DB(object):
     def init_db(self) -> None:
         from . import models
         models.Base.metadata.create_all(bind=self.engine)
+        if self.database_type == 'sqlite':
+            with self.engine.begin() as conn:
+                conn.execute(text(f"PRAGMA user_version = {models.SCHEMA_VERSION}"))
+            try:
+                with self.engine.begin() as conn:
+                    for statement in models.SQLITE_SEARCH_INDEX:
+                        conn.execute(text(statement))
+            except exc.OperationalError:
+                # sqlite compiled without fts5, the searches scan the table
+                pass
+
+    def schema_version(self) -> int | None:
+        """Version of the schema the sqlite database was created with"""
+        if self.database_type != 'sqlite':
+            return None
+        with self.engine.connect() as conn:
+            return conn.execute(text("PRAGMA user_version")).scalar()
+
+    def has_search_index(self) -> bool:
+        if self.database_type != 'sqlite':
+            return False
+        with self.engine.connect() as conn:
+            return conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'item_list_fts'")).first() is not None
        
\ No newline at end of file
@@ -1,10 +1,14 @@
 import json
 from typing import Any
+import unicodedata
 import sqlalchemy as sa
 from sqlalchemy.ext.declarative import declarative_base
 
 Base: Any = declarative_base()
 
+# Databases created with another version are created again (sqlite user_version)
+SCHEMA_VERSION = 2
+
 
 class JsonValue(Base):
     __tablename__ = 'json_value'
@@ -23,13 +27,24 @@ class JsonValue(Base):
     def data(self, value) -> None:
         self.data_str = json.dumps(value)
 
-    
+
+def normalize_search(text: str) -> str:
+    """Lowercase text without accents, used to search list items ignoring case and accents"""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
 class ItemList(Base):
     __tablename__ = 'item_list'
+    __table_args__ = (
+        # Prefix searches and the ordering of the results use this index
+        sa.Index('ix_item_list_search', 'model_name', 'list_name', 'search_key'),
+    )
     id = sa.Column(sa.Integer, primary_key=True)
     model_name = sa.Column(sa.String(300))
     list_name = sa.Column(sa.String(300))
     key = sa.Column(sa.String(300))
+    search_key = sa.Column(sa.String(300))
     value_str = sa.Column(sa.Text)
 
 
@@ -43,3 +58,34 @@ class ItemList(Base):
     @value.setter
     def value(self, value) -> None:
         self.value_str = json.dumps(value)
+
+
+class SyncedList(Base):
+    """Hash of the file each list was loaded from"""
+    __tablename__ = 'synced_list'
+    model_name = sa.Column(sa.String(300), primary_key=True)
+    list_name = sa.Column(sa.String(300), primary_key=True)
+    file_hash = sa.Column(sa.String(40))
+
+    def __repr__(self) -> str:
+        return f"{self.model_name} - {self.list_name}"
+
+
+# Trigram index of item_list.search_key, it finds the items that contain a term without
+# reading the whole table. It is kept up to date by triggers, bulk changes drop them and rebuild
+# the index at once
+SQLITE_SEARCH_TABLE = """CREATE VIRTUAL TABLE IF NOT EXISTS item_list_fts USING fts5(
+        search_key, content='item_list', content_rowid='id', tokenize='trigram')"""
+SQLITE_SEARCH_TRIGGERS = {
+    'item_list_fts_ai': """CREATE TRIGGER IF NOT EXISTS item_list_fts_ai AFTER INSERT ON item_list BEGIN
+        INSERT INTO item_list_fts(rowid, search_key) VALUES (new.id, new.search_key);
+    END""",
+    'item_list_fts_ad': """CREATE TRIGGER IF NOT EXISTS item_list_fts_ad AFTER DELETE ON item_list BEGIN
+        INSERT INTO item_list_fts(item_list_fts, rowid, search_key) VALUES ('delete', old.id, old.search_key);
+    END""",
+    'item_list_fts_au': """CREATE TRIGGER IF NOT EXISTS item_list_fts_au AFTER UPDATE ON item_list BEGIN
+        INSERT INTO item_list_fts(item_list_fts, rowid, search_key) VALUES ('delete', old.id, old.search_key);
+        INSERT INTO item_list_fts(rowid, search_key) VALUES (new.id, new.search_key);
+    END""",
+}
+SQLITE_SEARCH_INDEX = [SQLITE_SEARCH_TABLE, *SQLITE_SEARCH_TRIGGERS.values()]
@@ -1,7 +1,88 @@
+from collections import OrderedDict
+import json
 from pathlib import Path
-from typing import Optional
+import threading
+from typing import Any, Mapping, Optional, Sequence
+import sqlalchemy as sa
 from report_writer.api.database import db
-from report_writer.api.database.models import JsonValue, ItemList
+from report_writer.api.database.db import compile_regexp
+from report_writer.api.database.models import JsonValue, ItemList, SyncedList, SQLITE_SEARCH_TRIGGERS, normalize_search
+
+
+class SearchCache:
+    """LRU of the results of the last searches, typeahead widgets repeat the same queries
+    a lot. It is cleared whenever the version of the lists in the database changes"""
+
+    def __init__(self, maxsize: int = 512) -> None:
+        self.maxsize = maxsize
+        self._items: OrderedDict[tuple, list[dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.has_index: Optional[bool] = None
+        self.version: Optional[int] = None
+
+    def validate(self, version: int) -> None:
+        """Forgets the results when the lists were changed, by this or by another process"""
+        with self._lock:
+            if version != self.version:
+                self._items.clear()
+                self.has_index = None
+                self.version = version
+
+    def get(self, key: tuple) -> Optional[list[dict[str, Any]]]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: tuple, value: list[dict[str, Any]]) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.has_index = None
+            self.version = None
+
+
+search_cache = SearchCache()
+
+# A search with a limit ranks at most limit * SEARCH_CANDIDATES_FACTOR of the items that
+# contain the term
+SEARCH_CANDIDATES_FACTOR = 20
+
+
+# A sync that writes at least this many items rebuilds the trigram index at once
+FTS_REBUILD_MIN_ITEMS = 10000
+
+# Key of the json_value counter increased by every change of the lists
+LISTS_VERSION_KEY = "lists_version"
+
+
+def _lists_version() -> int:
+    row = db.session.execute(sa.text("SELECT data_str FROM json_value WHERE key = :key"),
+                             {'key': LISTS_VERSION_KEY}).first()
+    return int(row[0]) if row else 0
+
+
+def _bump_lists_version(conn: Any) -> None:
+    """Marks the lists as changed for the search caches of every process, conn can be a
+    connection or a session"""
+    params = {'key': LISTS_VERSION_KEY}
+    result = conn.execute(sa.text(
+        "UPDATE json_value SET data_str = CAST(data_str AS INTEGER) + 1 WHERE key = :key"), params)
+    if result.rowcount == 0:
+        conn.execute(sa.text("INSERT INTO json_value (key, data_str) VALUES (:key, '1')"), params)
+
+
+def _use_search_index() -> bool:
+    if search_cache.has_index is None:
+        search_cache.has_index = db.has_search_index()
+    return search_cache.has_index
 
 
 def get_json_value(key):
@@ -20,19 +101,96 @@ def save_json_value(key, data):
 
 def clear_item_list():
     db.session.query(ItemList).delete()
+    _bump_lists_version(db.session)
     db.session.commit()
+    search_cache.clear()
 
 
-def search_list_items(model_name: str, list_name: str, search_term: str, limit: Optional[int] = None) -> Optional[list[ItemList]]:
-    query = db.session.query(ItemList).filter(
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _search_rows(model_name: str, list_name: str, term: str, limit: Optional[int]) -> list[Any]:
+    base = db.session.query(ItemList.key, ItemList.value_str).filter(
         ItemList.model_name == model_name,
-        ItemList.list_name == list_name,
-        ItemList.key.ilike(f"%{search_term}%")
-    ).order_by(ItemList.key.asc())
+        ItemList.list_name == list_name
+    )
+    if db.database_type != 'sqlite':
+        query = base.filter(ItemList.search_key.like(f"%{_escape_like(term)}%", escape="\\")).order_by(ItemList.key.asc())
+        return (query.limit(limit) if limit else query).all()
+    # Items that start with the term come first, they are found by the index
+    query = base.filter(
+        ItemList.search_key >= term,
+        ItemList.search_key < term + "\U0010ffff"
+    ).order_by(ItemList.search_key.asc(), ItemList.key.asc())
+    rows = (query.limit(limit) if limit else query).all()
+    if not term or (limit and len(rows) >= limit):
+        return rows
+    # Then the items that contain the term, the closer to the start the better
+    if len(term) >= 3 and _use_search_index():
+        # The trigram index finds the candidates, the query must start from it. Broad terms match
+        # most of the list, so only the first candidates found are ranked. CROSS JOIN keeps sqlite from
+        # starting from the index of the list, which would take the candidates in alphabetical order
+        query = db.session.execute(sa.text(
+            "SELECT key, value_str FROM ("
+            "SELECT i.key, i.value_str, i.search_key FROM item_list_fts CROSS JOIN item_list i ON i.id = item_list_fts.rowid "
+            "WHERE item_list_fts MATCH :match AND i.model_name = :model_name AND i.list_name = :list_name "
+            "AND instr(i.search_key, :term) > 1 LIMIT :candidates"
+            ") ORDER BY instr(search_key, :term), search_key, key LIMIT :limit"
+        ), {
+            'match': '"' + term.replace('"', '""') + '"',
+            'model_name': model_name,
+            'list_name': list_name,
+            'term': term,
+            'candidates': max(limit * SEARCH_CANDIDATES_FACTOR, 1000) if limit else -1,
+            'limit': limit - len(rows) if limit else -1
+        })
+        return rows + query.all()
+    # Terms too short for the trigram index match almost every item, they are kept in the order
+    # of the index so the scan stops as soon as the limit is reached
+    query = base.filter(
+        sa.func.instr(ItemList.search_key, term) > 1,
+        ItemList.search_key.like(f"%{_escape_like(term)}%", escape="\\")
+    ).order_by(ItemList.search_key.asc(), ItemList.key.asc())
     if limit:
-        query = query.limit(limit)
-    return query.all()
-    
+        query = query.limit(limit - len(rows))
+    return rows + query.all()
+
+
+def search_list_items(model_name: str, list_name: str, search_term: str, limit: Optional[int] = None) -> list[dict[str, Any]]:
+    """Searches the items of a list whose key contains the term, ignoring case and accents.
+    Items whose key starts with the term come first"""
+    term = normalize_search(search_term.strip())
+    search_cache.validate(_lists_version())
+    cache_key = (model_name, list_name, term, limit)
+    items = search_cache.get(cache_key)
+    if items is None:
+        items = [{'key': key, 'value': json.loads(value_str)}
+                 for key, value_str in _search_rows(model_name, list_name, term, limit)]
+        search_cache.put(cache_key, items)
+    return items
+
+
+
+def search_list_items_regexp(model_name: str, list_name: str, pattern: str, limit: Optional[int] = None) -> list[dict[str, Any]]:
+    """Searches the items of a list whose key matches the regular expression, ignoring case.
+    Raises re.error if the pattern is invalid"""
+    compile_regexp(pattern)
+    search_cache.validate(_lists_version())
+    cache_key = ('regexp', model_name, list_name, pattern, limit)
+    items = search_cache.get(cache_key)
+    if items is None:
+        query = db.session.query(ItemList.key, ItemList.value_str).filter(
+            ItemList.model_name == model_name,
+            ItemList.list_name == list_name,
+            ItemList.key.op('regexp')(pattern)
+        ).order_by(ItemList.search_key.asc(), ItemList.key.asc())
+        if limit:
+            query = query.limit(limit)
+        items = [{'key': key, 'value': json.loads(value_str)} for key, value_str in query.all()]
+        search_cache.put(cache_key, items)
+    return items
+
 
 def get_last_workdir() -> Path:
     jvalue = db.session.query(JsonValue).filter(
@@ -54,23 +212,81 @@ def save_last_workdir(value: str | Path) -> None:
 
 def delete_lists() -> None:
     db.session.query(ItemList).delete()
+    db.session.query(SyncedList).delete()
+    _bump_lists_version(db.session)
     db.session.commit()
+    search_cache.clear()
     print("deletando listas")
 
 
-def save_list(model_name: str, list_name: str, items: list[dict]) -> None:
+def save_list(model_name: str, list_name: str, items: Sequence[Mapping[str, Any]]) -> None:
+    rows = _item_rows(model_name, list_name, items)
+    if rows:
+        db.session.execute(ItemList.__table__.insert(), rows)
+    _bump_lists_version(db.session)
+    db.session.commit()
+    search_cache.clear()
+
+
+def get_synced_lists() -> dict[tuple[str, str], str]:
+    """Hash of the file of each list in the database by (model_name, list_name)"""
+    return {(row.model_name, row.list_name): row.file_hash for row in db.session.query(SyncedList).all()}
+
+
+def _item_rows(model_name: str, list_name: str, items: Sequence[Mapping[str, Any]]) -> list[dict[str, Any]]:
+    rows = []
     for item in items:
-        item_list = ItemList()
-        item_list.model_name = model_name
-        item_list.list_name = list_name
         try:
-
-            item_list.key = item['key']
-            item_list.value = item['value']
-            db.session.add(item_list)
+            rows.append({
+                'model_name': model_name,
+                'list_name': list_name,
+                'key': str(item['key']),
+                'search_key': normalize_search(str(item['key'])),
+                'value_str': json.dumps(item['value'])
+            })
         except KeyError:
             continue
-    db.session.commit()
+    return rows
+
+
+def _drop_search_triggers(conn: Any) -> None:
+    for name in SQLITE_SEARCH_TRIGGERS:
+        conn.execute(sa.text(f"DROP TRIGGER IF EXISTS {name}"))
+
+
+def _rebuild_search_index(conn: Any) -> None:
+    """Fills the trigram index from item_list in one statement and creates the triggers again"""
+    conn.execute(sa.text("INSERT INTO item_list_fts(item_list_fts) VALUES ('rebuild')"))
+    for statement in SQLITE_SEARCH_TRIGGERS.values():
+        conn.execute(sa.text(statement))
+
+
+def sync_lists(changed: Sequence[tuple[str, str, Sequence[Mapping[str, Any]], str]], removed: list[tuple[str, str]]) -> None:
+    """Replaces the items of the changed lists, given as (model_name, list_name, items, file_hash),
+    and deletes the removed lists in a single transaction"""
+    items_table = ItemList.__table__
+    synced_table = SyncedList.__table__
+    rows_by_list = [(model_name, list_name, _item_rows(model_name, list_name, items), file_hash)
+                    for model_name, list_name, items, file_hash in changed]
+    # Updating the trigram index item by item costs much more than rebuilding it
+    rebuild = _use_search_index() and sum(len(c[2]) for c in rows_by_list) >= FTS_REBUILD_MIN_ITEMS
+    with db.engine.begin() as conn:
+        if rebuild:
+            _drop_search_triggers(conn)
+        for model_name, list_name in removed + [(c[0], c[1]) for c in changed]:
+            conn.execute(items_table.delete().where(
+                items_table.c.model_name == model_name, items_table.c.list_name == list_name))
+            conn.execute(synced_table.delete().where(
+                synced_table.c.model_name == model_name, synced_table.c.list_name == list_name))
+        for model_name, list_name, rows, file_hash in rows_by_list:
+            if rows:
+                conn.execute(items_table.insert(), rows)
+            conn.execute(synced_table.insert(), {
+                'model_name': model_name, 'list_name': list_name, 'file_hash': file_hash})
+        if rebuild:
+            _rebuild_search_index(conn)
+        _bump_lists_version(conn)
+    search_cache.clear()
 
 
 def get_list(model_name: str, list_name: str, filter: Optional[str] = None) -> Optional[list[ItemList]]:
@@ -79,5 +295,5 @@ def get_list(model_name: str, list_name: str, filter: Optional[str] = None) -> O
         ItemList.model_name == model_name
     )
     if filter:
-        query = query.filter(ItemList.key.ilike(f"%{filter}%"))
+        query = query.filter(ItemList.search_key.like(f"%{_escape_like(normalize_search(filter))}%", escape="\\"))
     return query.order_by(ItemList.key.asc()).all()
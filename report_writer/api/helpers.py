@@ -1,20 +1,67 @@
+from pathlib import Path
+from typing import TypedDict
 from report_writer.api.database import db
 from report_writer.api.database import repo
+from report_writer.api.database.models import SCHEMA_VERSION
 from report_writer import ReportWriter
 from report_writer.api import config
+from report_writer.file_cache import file_hash
+from report_writer.model_lists import list_files, ParsedList
+from report_writer.types import ModelListItem
 
-def reacreate_db():
-    print("Recreating DB")
-    try:
-        config.DBFILE.unlink()
-    except FileNotFoundError:
-        pass
+
+class SyncSummary(TypedDict):
+    updated: list[str]
+    removed: list[str]
+    unchanged: int
+
+
+def _create_db() -> None:
+    db.engine.dispose()
+    # The wal and shm files of the old database must not be used with the new one
+    for suffix in ("", "-wal", "-shm"):
+        config.DBFILE.with_name(config.DBFILE.name + suffix).unlink(missing_ok=True)
     db.init_db()
 
-    rw = ReportWriter("./models")
-    docmodels = rw.list_models()
-    for d in docmodels:
-        rw.set_model(d)
-        lists = rw.get_lists()
-        for l in lists:
-            repo.save_list(d, l["name"], l["items"])
\ No newline at end of file
+
+def reacreate_db() -> SyncSummary:
+    print("Recreating DB")
+    _create_db()
+    return sync_lists()
+
+
+def sync_db(verbose=True) -> SyncSummary:
+    """Creates the database if it doesn't exist or was created by another version and loads the
+    lists that changed since the last synchronization"""
+    if not config.DBFILE.exists() or db.schema_version() != SCHEMA_VERSION:
+        if verbose:
+            print("Creating DB")
+        _create_db()
+    return sync_lists(verbose=verbose)
+
+
+def sync_lists(models_folder: str | Path = "./models", verbose=True) -> SyncSummary:
+    """Rewrites in the database only the lists whose files changed, comparing the hash of each
+    file with the hash saved when the list was loaded"""
+    rw = ReportWriter(models_folder)
+    synced = repo.get_synced_lists()
+    summary: SyncSummary = {'updated': [], 'removed': [], 'unchanged': 0}
+    changed: list[tuple[str, str, list[ModelListItem], str]] = []
+    found: set[tuple[str, str]] = set()
+    for model_name in rw.list_models():
+        for list_name, path in list_files(rw.models_folder / model_name / "lists").items():
+            found.add((model_name, list_name))
+            hash_ = file_hash(path)
+            if synced.get((model_name, list_name)) == hash_:
+                summary['unchanged'] += 1
+                continue
+            changed.append((model_name, list_name, ParsedList(path).items, hash_))
+            summary['updated'].append(f"{model_name}/{list_name}")
+    removed = [key for key in synced if key not in found]
+    summary['removed'] = [f"{model_name}/{list_name}" for model_name, list_name in removed]
+    if changed or removed:
+        repo.sync_lists(changed, removed)
+    if verbose:
+        print(f"Lists: {len(summary['updated'])} updated, {len(summary['removed'])} removed, "
+              f"{summary['unchanged']} unchanged")
+    return summary
@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+import threading
+import traceback
+from typing import Any, Callable, Literal, TypedDict
+from uuid import uuid4
+from report_writer.profiling import PhaseInfo
+
+JobStatus = Literal['queued', 'running', 'done', 'error']
+
+
+class JobInfo(TypedDict):
+    id: str
+    status: JobStatus
+    phase: str
+    error: str | None
+    profile: list[PhaseInfo] | None
+
+
+class RenderJob:
+    def __init__(self, folder: Path) -> None:
+        self.id = str(uuid4())
+        self.dest_file = folder / f"{self.id}.docx"
+        self.status: JobStatus = 'queued'
+        self.phase = 'queued'
+        self.error: str | None = None
+        self.profile: list[PhaseInfo] | None = None
+        self.created_at = datetime.now()
+        self.finished_at: datetime | None = None
+
+    def set_phase(self, phase: str) -> None:
+        self.phase = phase
+
+    def to_dict(self) -> JobInfo:
+        return {
+            'id': self.id,
+            'status': self.status,
+            'phase': self.phase,
+            'error': self.error,
+            'profile': self.profile
+        }
+
+
+class JobManager:
+    """Runs render jobs on a bounded pool of threads and keeps their status in memory"""
+
+    def __init__(self, max_workers: int, ttl: timedelta) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="render")
+        self.ttl = ttl
+        self._jobs: dict[str, RenderJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, folder: Path, func: Callable[[RenderJob], Any]) -> RenderJob:
+        """Schedules func to be executed with the new job as argument. The function must write
+        the result on job.dest_file, which is created inside folder"""
+        self.delete_old_jobs()
+        job = RenderJob(folder)
+        with self._lock:
+            self._jobs[job.id] = job
+        self.executor.submit(self._run, job, func)
+        return job
+
+    def _run(self, job: RenderJob, func: Callable[[RenderJob], Any]) -> None:
+        job.status = 'running'
+        try:
+            func(job)
+            job.status = 'done'
+            job.phase = 'done'
+        except Exception as e:
+            traceback.print_exc()
+            job.status = 'error'
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now()
+
+    def get(self, job_id: str) -> RenderJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def delete_old_jobs(self) -> None:
+        """Forgets finished jobs older than ttl, deleting their files"""
+        limit = datetime.now() - self.ttl
+        with self._lock:
+            old = [job for job in self._jobs.values()
+                   if job.finished_at is not None and job.finished_at < limit]
+            for job in old:
+                del self._jobs[job.id]
+        for job in old:
+            try:
+                job.dest_file.unlink()
+            except FileNotFoundError:
+                pass
@@ -1,8 +1,12 @@
+from contextvars import ContextVar
 from report_writer.widgets.widget import Widget
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from report_writer import ReportWriter
 
+# ReportWriter of the request using a form shared between requests (see FormSchema.bind)
+bound_report_writer: ContextVar['ReportWriter | None'] = ContextVar("bound_report_writer", default=None)
+
 
 class BaseWebForm:
 
@@ -23,9 +27,10 @@ class BaseWebForm:
 
     @property
     def report_writer(self) -> 'ReportWriter':
-        if self._report_writer is None:
+        rw = bound_report_writer.get() or self._report_writer
+        if rw is None:
             raise Exception("ReportWriter instance was not injected on form")
-        return self._report_writer
+        return rw
 
     def set_report_writer(self, rw: 'ReportWriter') -> None:
         self._report_writer = rw
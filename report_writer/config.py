@@ -5,4 +5,14 @@ import tempfile
 LIBDIR = Path(os.path.dirname(os.path.realpath(__file__)))
 TEMPFOLDER = Path(tempfile.gettempdir(), "report_writer")
 if not TEMPFOLDER.exists():
-    TEMPFOLDER.mkdir()
\ No newline at end of file
+    TEMPFOLDER.mkdir()
+
+# Images inserted in documents are downsampled to this resolution considering the width they are placed
+IMAGES_DPI = 200
+IMAGES_JPEG_QUALITY = 85
+IMAGES_CACHE_FOLDER = TEMPFOLDER / "images"
+
+# Limits of zip files uploaded to widgets
+ZIP_MAX_ENTRIES = 5000
+ZIP_MAX_SIZE = 4 * 1024 ** 3
+ZIP_WORKERS = 4
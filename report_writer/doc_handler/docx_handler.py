@@ -1,39 +1,61 @@
 from pathlib import Path
-from typing import Optional, Union
+from typing import IO, Optional, Union
 from docxtpl import DocxTemplate, InlineImage, Subdoc
-from report_writer.doc_handler.jenv import make_jinja_env
+from report_writer.doc_handler.jenv import get_jinja_env, overlay_jinja_env
 from docx.shared import Mm
 from uuid import uuid4
 from report_writer.doc_handler.subdoc_html import SubdocHtmlFunction
 from report_writer.module_model import ModuleModel
 from report_writer.doc_handler.subdoc import SubdocFunction
+from report_writer.doc_handler.template_cache import load_template
+from report_writer.doc_handler.images import prepare_image
+from report_writer.doc_handler.media import index_media
+from report_writer.profiling import profile_phase
 
 
 class SInlineImage:
-    def __init__(self, tpl):
+    def __init__(self, tpl, dpi: int | None = None, quality: int | None = None):
         self.tpl = tpl
+        self.dpi = dpi
+        self.quality = quality
+        # source -> (width, prepared image). A picture placed more than once reuses the widest
+        # version already prepared in this render, so only one copy goes to the document
+        self._prepared: dict[Path, tuple[float, Path]] = {}
 
     def __call__(self, file, width):
+        with profile_phase("image"):
+            return self._image(file, width)
+
+    def _image(self, file, width):
         path = Path(file)
         if not path.exists():
             return
-        return InlineImage(self.tpl, file, width=Mm(width))
+        try:
+            prepared_width, prepared = self._prepared[path]
+        except KeyError:
+            prepared_width, prepared = 0, path
+        if prepared_width < width:
+            prepared = prepare_image(path, width, dpi=self.dpi, quality=self.quality)
+            self._prepared[path] = (width, prepared)
+        return InlineImage(self.tpl, str(prepared), width=Mm(width))
 
 
 class DocxHandler:
     def __init__(self, module_model: ModuleModel):
         self.module_model = module_model
         self.templates_folder = self.module_model.docx_templates_folder
-        self.jinja_env = make_jinja_env(self.module_model)
+        self.jinja_env = get_jinja_env(self.module_model)
         self.context = None
         self.pos_subdocs: list[Subdoc]  = []
 
     def prepare_jinja_env(self, tpl: DocxTemplate):
-        self.jinja_env.globals['subdoc'] = SubdocFunction(tpl, self.module_model)
-        jinja_env2 = make_jinja_env(self.module_model, self.module_model.html_templates_folder)
-        self.jinja_env.globals['subdoc_html'] = SubdocHtmlFunction(self, tpl, self.module_model, jinja_env2)
-        self.jinja_env.globals['image'] = SInlineImage(tpl)
-        return self.jinja_env
+        jinja_env2 = overlay_jinja_env(get_jinja_env(self.module_model, self.module_model.html_templates_folder))
+        return overlay_jinja_env(
+            self.jinja_env,
+            subdoc=SubdocFunction(tpl, self.module_model),
+            subdoc_html=SubdocHtmlFunction(self, tpl, self.module_model, jinja_env2),
+            image=SInlineImage(tpl)
+        )
 
     def render_temp(self, template, context):
         path = self.templates_folder / template
@@ -45,15 +67,21 @@ class DocxHandler:
             tpl.save(tempfile)
             return tempfile
 
-    def render(self, template: str, context, dest_file: Union[Path, str]) -> Optional[Path]:
+    def render(self, template: str, context, dest_file: Union[Path, str, IO[bytes]]) -> Union[Path, IO[bytes], None]:
+        """Render the template to dest_file, which can be a path or a writable binary stream"""
         self.context = context
-        dest_file = Path(dest_file)
+        if isinstance(dest_file, str):
+            dest_file = Path(dest_file)
         path = self.templates_folder / template
         if path.exists():
-            tpl = DocxTemplate(str(path))
-            jinja_env = self.prepare_jinja_env(tpl)
-            tpl.render(context, jinja_env)
-            tpl.save(dest_file)
+            with profile_phase("load_template"):
+                tpl = load_template(path)
+                index_media(tpl.docx)
+                jinja_env = self.prepare_jinja_env(tpl)
+            with profile_phase("render_template"):
+                tpl.render(context, jinja_env)
+            with profile_phase("save"):
+                tpl.save(dest_file)
       
 
             #Renderizar uma segunda vez para inserir os subdocs referenciados nos templates html
@@ -84,6 +84,15 @@ class Filters:
     def numero_extenso_fem(value):
         return get_extenso(value, feminino=True)
 
+    @staticmethod
+    def numeros_extenso(values, feminino=False):
+        """Extenso de cada número de uma lista, ex.: uma coluna de tabela"""
+        return get_extenso_many(values, feminino=feminino)
+
+    @staticmethod
+    def datas_completas(values):
+        return [Filters.data_completa(value) for value in values]
+
     @staticmethod
     def mes_extenso(value):
         if not isinstance(value, datetime):
@@ -150,6 +159,10 @@ class Filters:
         text = f"{prefix}{value_str} ({middle_text})"
         return text
 
+    @staticmethod
+    def moedas_extenso(values, prefix="R$ "):
+        return [Filters.moeda_extenso(value, prefix=prefix) for value in values]
+
 
 
 filters = [getattr(Filters, func) for func in dir(Filters) if callable(
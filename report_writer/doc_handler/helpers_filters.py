@@ -1,37 +1,45 @@
+from functools import lru_cache
+from typing import Any, Iterable
+
+TRIOEXTENSO_MASCULINO = (
+    ("dummy", "um", "dois", "três", "quatro", "cinco", "seis", "sete",
+              "oito", "nove"),
+    ("dez", "onze", "doze", "treze", "quatorze", "quinze", "dezesseis",
+     "dezessete", "dezoito", "dezenove"),
+    ("dummy", "dummy", "vinte", "trinta", "quarenta", "cinquenta",
+              "sessenta", "setenta", "oitenta", "noventa"),
+    ("dummy", "cento", "duzentos", "trezentos", "quatrocentos",
+              "quinhentos", "seiscentos", "setecentos", "oitocentos",
+              "novecentos"))
+TRIOEXTENSO_FEMININO = (
+    ("dummy", "uma", "duas", "três", "quatro", "cinco", "seis", "sete",
+              "oito", "nove"),
+    TRIOEXTENSO_MASCULINO[1],
+    TRIOEXTENSO_MASCULINO[2],
+    ("dummy", "cento", "duzentas", "trezentas", "quatrocentas",
+              "quinhentas", "seiscentas", "setecentas", "oitocentas",
+              "novecentas"))
+CLASSEXTENSO = (
+    "dummy", "mil", "milh", "bilh", "trilh", "quatrilh",
+    "quintilh", "sextilh", "septilh", "octilh",
+    "nonilh", "decilh", "undecilh", "duodecilh",
+              "tredecilh", "quatordecilh", "quindecilh",
+              "sexdecilh", "setedecilh", "octodecilh",
+              "novedecilh", "vigesilh")
+
+
 class NumeroExtenso():
     trioextenso = ()
     classextenso = ()
+    # Extenso de cada trio de 000 a 999, preenchidos ao final do módulo
+    trios_masculino: tuple[str, ...] = ()
+    trios_feminino: tuple[str, ...] = ()
 
     def __init__(self):
-        self.trioextenso_masculino = (
-            ("dummy", "um", "dois", "três", "quatro", "cinco", "seis", "sete",
-                      "oito", "nove"),
-            ("dez", "onze", "doze", "treze", "quatorze", "quinze", "dezesseis",
-             "dezessete", "dezoito", "dezenove"),
-            ("dummy", "dummy", "vinte", "trinta", "quarenta", "cinquenta",
-                      "sessenta", "setenta", "oitenta", "noventa"),
-            ("dummy", "cento", "duzentos", "trezentos", "quatrocentos",
-                      "quinhentos", "seiscentos", "setecentos", "oitocentos",
-                      "novecentos"))
-        self.trioextenso_feminino = (
-            ("dummy", "uma", "duas", "três", "quatro", "cinco", "seis", "sete",
-                      "oito", "nove"),
-            ("dez", "onze", "doze", "treze", "quatorze", "quinze", "dezesseis",
-             "dezessete", "dezoito", "dezenove"),
-            ("dummy", "dummy", "vinte", "trinta", "quarenta", "cinquenta",
-                      "sessenta", "setenta", "oitenta", "noventa"),
-            ("dummy", "cento", "duzentas", "trezentas", "quatrocentas",
-                      "quinhentas", "seiscentas", "setecentas", "oitocentas",
-                      "novecentas"))
-        self.classextenso = (
-            "dummy", "mil", "milh", "bilh", "trilh", "quatrilh",
-            "quintilh", "sextilh", "septilh", "octilh",
-            "nonilh", "decilh", "undecilh", "duodecilh",
-                      "tredecilh", "quatordecilh", "quindecilh",
-                      "sexdecilh", "setedecilh", "octodecilh",
-                      "novedecilh", "vigesilh")
+        self.trioextenso_masculino = TRIOEXTENSO_MASCULINO
+        self.trioextenso_feminino = TRIOEXTENSO_FEMININO
+        self.classextenso = CLASSEXTENSO
         self.trioextenso = self.trioextenso_masculino
-        
 
     def escrever_trio_extenso(self, trio):
         """
@@ -105,6 +113,7 @@ class NumeroExtenso():
         string.
         """
         self.trioextenso = self.trioextenso_feminino if feminino else self.trioextenso_masculino
+        trios = self.trios_feminino if feminino else self.trios_masculino
         # Remove os zeros iniciais e faz padding
         # para números com quantidade de algarismos
         # não múltipla de 3
@@ -127,7 +136,7 @@ class NumeroExtenso():
             trioInt = int(trio)
 
             if trioInt > 0:
-                saida = self.escrever_trio_extenso(trio)
+                saida = trios[trioInt] if trio.isdigit() else self.escrever_trio_extenso(trio)
                 if contador > 0:
                     saida = saida + ' ' + self.classextenso[contador]
                 if contador > 1:
@@ -151,11 +160,30 @@ class NumeroExtenso():
         return extensofinal.rstrip('\n')
 
 
+def _escrever_trios(trioextenso: tuple) -> tuple[str, ...]:
+    n = NumeroExtenso()
+    n.trioextenso = trioextenso
+    return tuple(n.escrever_trio_extenso(f"{i:03d}") for i in range(1000))
+
+
+NumeroExtenso.trios_masculino = _escrever_trios(TRIOEXTENSO_MASCULINO)
+NumeroExtenso.trios_feminino = _escrever_trios(TRIOEXTENSO_FEMININO)
+
+
+@lru_cache(maxsize=8192)
+def _get_extenso(num: str, feminino: bool) -> str:
+    return NumeroExtenso().getExtenso(num, quebradelinhas=0, feminino=feminino)
+
+
 def get_extenso(num, feminino=False):
     if not isinstance(num, str):
         num = str(num)
-    n = NumeroExtenso()
-    return n.getExtenso(num, quebradelinhas=0, feminino=feminino)
+    return _get_extenso(num, bool(feminino))
+
+
+def get_extenso_many(values: Iterable[Any], feminino=False) -> list[str]:
+    """Extenso de uma coluna de números"""
+    return [get_extenso(value, feminino=feminino) for value in values]
 
 
 if __name__ == "__main__":
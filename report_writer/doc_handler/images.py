@@ -0,0 +1,55 @@
+import os
+from pathlib import Path
+from uuid import uuid4
+from PIL import Image
+from report_writer import config
+from report_writer.file_cache import hashes_cache
+
+MM_PER_INCH = 25.4
+
+
+def prepare_image(file: str | Path, width: float,
+                  dpi: int | None = None,
+                  quality: int | None = None,
+                  cache_folder: str | Path | None = None) -> Path:
+    """Returns a version of the image downsampled to be shown with width millimeters at dpi resolution.
+    The prepared images are cached on disk by the content of the original file, so the same picture
+    is prepared only once. If the image is already small enough or can't be read by Pillow the
+    original path is returned. dpi, quality and cache_folder default to the values in config."""
+    dpi = dpi or config.IMAGES_DPI
+    quality = quality or config.IMAGES_JPEG_QUALITY
+    cache_folder = Path(cache_folder or config.IMAGES_CACHE_FOLDER)
+    path = Path(file)
+    target_width = max(1, round(width / MM_PER_INCH * dpi))
+    try:
+        digest = hashes_cache.get(path)
+        for ext in (".jpg", ".png"):
+            cached = cache_folder / f"{digest}_{target_width}_{dpi}_{quality}{ext}"
+            if cached.exists():
+                return cached
+        with Image.open(path) as image:
+            if image.width <= target_width:
+                return path
+            target_height = max(1, round(image.height * target_width / image.width))
+            # Let the jpeg decoder do most of the downscaling
+            image.draft("RGB", (target_width, target_height))
+            exif = image.info.get("exif")
+            has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+            resized = image.resize((target_width, target_height), Image.Resampling.LANCZOS)
+        cache_folder.mkdir(parents=True, exist_ok=True)
+        if has_alpha:
+            cached = cache_folder / f"{digest}_{target_width}_{dpi}_{quality}.png"
+            options: dict = {'format': "PNG", 'optimize': True}
+        else:
+            cached = cache_folder / f"{digest}_{target_width}_{dpi}_{quality}.jpg"
+            resized = resized.convert("RGB")
+            options = {'format': "JPEG", 'quality': quality, 'optimize': True}
+            if exif:
+                options['exif'] = exif
+        # Write to a temp file first so a concurrent render never reads a partial image
+        tempfile = cache_folder / f"{uuid4()}.tmp"
+        resized.save(tempfile, **options)
+        os.replace(tempfile, cached)
+        return cached
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return path
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Any
 import jinja2
 
 from report_writer.module_model import ModuleModel
@@ -26,3 +27,21 @@ def make_jinja_env(module_model: ModuleModel, folder_templates: str | Path | Non
     for function_ in custom_functions:
         jinja_env.globals[function_.__name__] = function_
     return jinja_env
+
+
+def get_jinja_env(module_model: ModuleModel, folder_templates: str | Path | None = None) -> jinja2.Environment:
+    """Returns the environment with the filters and functions of the model. It is built once per
+    model version and shared by all renders, so it must not be modified. Use overlay_jinja_env
+    to add objects that belong to a single render."""
+    key = f"jinja_env:{folder_templates}"
+    try:
+        return module_model.cache[key]
+    except KeyError:
+        return module_model.cache.setdefault(key, make_jinja_env(module_model, folder_templates))
+
+
+def overlay_jinja_env(jinja_env: jinja2.Environment, **globals_: Any) -> jinja2.Environment:
+    """Returns an environment linked to jinja_env with its own globals"""
+    env = jinja_env.overlay()
+    env.globals = {**jinja_env.globals, **globals_}
+    return env
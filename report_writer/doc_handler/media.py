@@ -0,0 +1,76 @@
+import io
+import re
+from typing import Any
+from docx.image.image import Image
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import qn
+from docx.package import ImageParts
+from docx.parts.image import ImagePart
+from report_writer.doc_handler.template_cache import CachedDocxTemplate
+
+# Prefix given to the references of a subtemplate body to its own pictures. Pictures passed to
+# the subdoc by image() already reference the main document and must not be remapped
+SUBDOC_MEDIA_PREFIX = "subdoc-"
+
+_blip_embed = re.compile(r'(<a:blip\b[^>]*?\br:embed=")(rId[0-9]+)"')
+
+
+class IndexedImageParts(ImageParts):
+    """ImageParts that finds an image with the same content by a dict instead of hashing every
+    image of the package each time a new one is added"""
+
+    def __init__(self, image_parts: ImageParts) -> None:
+        super().__init__()
+        self._by_sha1: dict[str, ImagePart] = {}
+        for part in image_parts:
+            self.append(part)
+
+    def append(self, item: ImagePart) -> None:
+        super().append(item)
+        self._by_sha1.setdefault(item.sha1, item)
+
+    def get_or_add_image_part(self, image_descriptor: Any) -> ImagePart:
+        image = Image.from_file(image_descriptor)
+        try:
+            return self._by_sha1[image.sha1]
+        except KeyError:
+            return self._add_image_part(image)
+
+    def _get_by_sha1(self, sha1: str) -> ImagePart | None:
+        return self._by_sha1.get(sha1)
+
+
+def index_media(docx: Any) -> None:
+    """Makes the images added to the document be stored once for each distinct content"""
+    package = docx.part.package
+    if not isinstance(package.image_parts, IndexedImageParts):
+        # image_parts is a lazyproperty cached in the instance dict
+        package.__dict__['image_parts'] = IndexedImageParts(package.image_parts)
+
+
+def mark_subdoc_media(subtpl: CachedDocxTemplate) -> None:
+    """Before the subtemplate is rendered, marks the references of its body to its own pictures
+    so attach_subdoc_media can tell them apart"""
+    rels = subtpl.docx.part.rels
+    image_rids = {rid for rid, rel in rels.items() if not rel.is_external and rel.reltype == RT.IMAGE}
+    if not image_rids:
+        return
+
+    def mark(match: re.Match) -> str:
+        if match.group(2) not in image_rids:
+            return match.group(0)
+        return f'{match.group(1)}{SUBDOC_MEDIA_PREFIX}{match.group(2)}"'
+
+    subtpl.patch_body_xml(lambda xml: _blip_embed.sub(mark, xml))
+
+
+def attach_subdoc_media(docx: Any, subdocx: Any) -> None:
+    """Relates the images marked by mark_subdoc_media in the body of subdocx to the main document
+    part, reusing the images of the main document with the same content, and rewrites their
+    references. Any other reference is left as it is"""
+    part = docx.part
+    sub_rels = subdocx.part.rels
+    for blip in subdocx.element.body.xpath(f'.//a:blip[starts-with(@r:embed, "{SUBDOC_MEDIA_PREFIX}")]'):
+        rel = sub_rels[blip.get(qn('r:embed'))[len(SUBDOC_MEDIA_PREFIX):]]
+        rid, _ = part.get_or_add_image(io.BytesIO(rel.target_part.blob))
+        blip.set(qn('r:embed'), rid)
@@ -3,16 +3,30 @@ from typing import Any
 from docxtpl.subdoc import Subdoc
 from report_writer.module_model import ModuleModel
 from docxtpl import DocxTemplate
+from report_writer.doc_handler.template_cache import load_template
+from report_writer.doc_handler.media import attach_subdoc_media, mark_subdoc_media
+from report_writer.profiling import profile_phase
+
+def subdoc_from_docx(tpl: DocxTemplate, docx: Any) -> Subdoc:
+    """Same as tpl.new_subdoc() with subdocx replaced by docx, but without parsing the
+    python-docx default document that would be discarded. The images of docx are added to the
+    main document, stored only once when the same picture is already there"""
+    sd: Subdoc = Subdoc.__new__(Subdoc)
+    sd.tpl = tpl
+    sd.docx = tpl.get_docx()
+    sd.subdocx = docx
+    attach_subdoc_media(sd.docx, docx)
+    return sd
+
 
 def add_subdoc_from_template(tpl: DocxTemplate, template: str|Path, context: Any) -> Subdoc:
     path = Path(template)
     if not path.exists():
         raise FileNotFoundError(f"the template \"{path}\" was not found")
-    subtpl = DocxTemplate(str(path))
+    subtpl = load_template(path)
+    mark_subdoc_media(subtpl)
     subtpl.render(context)
-    sd: Subdoc = tpl.new_subdoc()
-    sd.subdocx = subtpl.docx
-    return sd
+    return subdoc_from_docx(tpl, subtpl.docx)
        
 
 class SubdocFunction:
@@ -25,7 +39,8 @@ class SubdocFunction:
         #     context = {'data': context}
         path = self.module_model.docx_templates_folder / template
         try:
-            return add_subdoc_from_template(self.tpl, path, kargs)
+            with profile_phase(f"subdoc:{template}"):
+                return add_subdoc_from_template(self.tpl, path, kargs)
         except FileNotFoundError:
             return 
         # if not path.exists():
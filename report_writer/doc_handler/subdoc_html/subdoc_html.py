@@ -3,8 +3,10 @@ from bs4 import BeautifulSoup
 from docxtpl import DocxTemplate, Subdoc
 import jinja2
 from report_writer.module_model import ModuleModel
+from report_writer.doc_handler.template_cache import load_template
 from .elment_parses import parse_element
 from uuid import uuid4
+from report_writer.profiling import profile_phase
 
 if TYPE_CHECKING:
     from report_writer.doc_handler import DocxHandler
@@ -18,8 +20,9 @@ class SubdocDocxFunction:
     def __call__(self, template, **context):
         n = len(self.docx_handler.pos_subdocs)
         path = self.docx_handler.module_model.docx_templates_folder / template
-        subtpl = DocxTemplate(path)
-        subtpl.render(context)
+        with profile_phase(f"subdoc_docx:{template}"):
+            subtpl = load_template(path)
+            subtpl.render(context)
         # sd: Subdoc = self.tpl.new_subdoc()
         # sd.subdocx = subtpl.docx
         self.docx_handler.pos_subdocs.append(subtpl)
@@ -36,6 +39,10 @@ class SubdocHtmlFunction:
 
 
     def __call__(self, template: str, context: Any = None) -> Subdoc:
+        with profile_phase(f"subdoc_html:{template}"):
+            return self._subdoc_html(template, context)
+
+    def _subdoc_html(self, template: str, context: Any = None) -> Subdoc:
         if not isinstance(context, dict):
             context = {'data': context}
         sd = self.tpl.new_subdoc()
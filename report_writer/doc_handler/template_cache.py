@@ -0,0 +1,46 @@
+import copy
+from pathlib import Path
+from typing import Any, Callable
+from docxtpl import DocxTemplate
+from report_writer.file_cache import FileCache
+
+
+class ParsedTemplate:
+    """A docx template already unzipped, parsed and with its body xml patched by docxtpl"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        tpl = DocxTemplate(str(path))
+        tpl.init_docx()
+        self.docx = tpl.docx
+        self.body_xml: str = tpl.patch_xml(tpl.get_xml())
+
+
+class CachedDocxTemplate(DocxTemplate):
+    """DocxTemplate that starts from a copy of a parsed template instead of reading the file"""
+
+    def __init__(self, parsed: ParsedTemplate) -> None:
+        super().__init__(str(parsed.path))
+        self.docx = copy.deepcopy(parsed.docx)
+        self._body_xml: str | None = parsed.body_xml
+
+    def build_xml(self, context: Any, jinja_env: Any = None) -> str:
+        if self._body_xml is None:
+            return super().build_xml(context, jinja_env)
+        # The patched xml is only valid for the pristine copy, a second render reloads the file
+        xml, self._body_xml = self._body_xml, None
+        return self.render_xml_part(xml, self.docx._part, context, jinja_env)
+
+    def patch_body_xml(self, patch: Callable[[str], str]) -> None:
+        """Changes the xml of the body that will be rendered. Only valid before the first render"""
+        if self._body_xml is None:
+            self._body_xml = self.patch_xml(self.get_xml())
+        self._body_xml = patch(self._body_xml)
+
+
+templates_cache: FileCache[ParsedTemplate] = FileCache(ParsedTemplate, maxsize=64)
+
+
+def load_template(path: str | Path) -> CachedDocxTemplate:
+    """Returns a new DocxTemplate for the file, parsing it only the first time or when it changes"""
+    return CachedDocxTemplate(templates_cache.get(path))
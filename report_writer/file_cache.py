@@ -0,0 +1,70 @@
+from collections import OrderedDict
+import hashlib
+from pathlib import Path
+import os
+import threading
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+def file_signature(path: str | Path) -> tuple[int, int]:
+    """Returns a value that changes whenever the file is modified"""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+class FileCache(Generic[T]):
+    """Thread-safe LRU cache of values built from files. The value of a file is
+    built again by the loader whenever the file mtime or size changes"""
+
+    def __init__(self, loader: Callable[[Path], T], maxsize: int = 128) -> None:
+        self.loader = loader
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict[str, tuple[tuple[int, int], T]] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, path: str | Path) -> T:
+        path = Path(path).absolute()
+        key = str(path)
+        signature = file_signature(path)
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[0] == signature:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            self.misses += 1
+            value = self.loader(path)
+            self._items[key] = (signature, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+            return value
+
+    def invalidate(self, path: str | Path) -> None:
+        with self._lock:
+            self._items.pop(str(Path(path).absolute()), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._items)}
+
+
+def file_hash(path: Path) -> str:
+    h = hashlib.sha1()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# The hash of a file is calculated again only when the file changes
+hashes_cache: FileCache[str] = FileCache(file_hash, maxsize=4096)
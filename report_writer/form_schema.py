@@ -0,0 +1,57 @@
+from contextlib import contextmanager
+from typing import Any, Iterator, Tuple, TYPE_CHECKING
+from report_writer.base_web_form import BaseWebForm, bound_report_writer
+from report_writer.module_model import ModuleModel
+from report_writer.types import ErrorsType, WidgetAttributesType
+from report_writer.widgets import Widget
+from report_writer.widgets.composite_widget import CompositeWidget
+
+if TYPE_CHECKING:
+    from report_writer import ReportWriter
+
+
+class FormSchema:
+    """The widgets of the form of a model, defined once for each version of the model and shared
+    by every ReportWriter of the process. Widgets keep no state of a request, the ReportWriter of
+    the request is bound to the form while the schema is used"""
+    __slots__ = ('form', 'widgets', 'widgets_map', 'composite')
+
+    def __init__(self, module_model: ModuleModel, rw: 'ReportWriter') -> None:
+        self.form: BaseWebForm = module_model.get_web_form()
+        with self.bind(rw):
+            self.form.define_widgets()
+        self.widgets: list[list[Widget]] = self.form.widgets
+        self.widgets_map: dict[str, Widget] = self.form.widgets_map
+        self.composite = CompositeWidget(self.widgets)
+
+    @contextmanager
+    def bind(self, rw: 'ReportWriter') -> Iterator[BaseWebForm]:
+        token = bound_report_writer.set(rw)
+        try:
+            yield self.form
+        finally:
+            bound_report_writer.reset(token)
+
+    def get_layout(self, rw: 'ReportWriter') -> list[list[WidgetAttributesType]]:
+        with self.bind(rw):
+            return [[w.get_layout() for w in row] for row in self.widgets]
+
+    def get_default_data(self, rw: 'ReportWriter') -> dict[str, Any]:
+        with self.bind(rw):
+            return {w.name: w.get_default_data() for row in self.widgets for w in row}
+
+    def convert_data(self, rw: 'ReportWriter', data: dict) -> Tuple[Any, ErrorsType]:
+        with self.bind(rw):
+            return self.composite.convert_data(data)
+
+    def get_update_data(self, rw: 'ReportWriter', field_name: str, payload: Any) -> Any:
+        with self.bind(rw):
+            return self.widgets_map[field_name].get_update_data(payload)
+
+
+def get_form_schema(module_model: ModuleModel, rw: 'ReportWriter') -> FormSchema:
+    """Returns the schema of the model, built by the first call for each version of the model"""
+    schema = module_model.cache.get("form_schema")
+    if schema is None:
+        schema = module_model.cache["form_schema"] = FormSchema(module_model, rw)
+    return schema
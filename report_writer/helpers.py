@@ -1,36 +1,151 @@
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import shutil
+import struct
+import subprocess
+from typing import TypedDict
 from PIL import ImageOps, Image
 
+ORIENTATION_TAG = 0x0112
 
-def exif_transpose_pic(pic: str | Path) -> None:
+# Options of jpegtran that undo each exif orientation
+JPEGTRAN_OPERATIONS: dict[int, list[str]] = {
+    2: ["-flip", "horizontal"],
+    3: ["-rotate", "180"],
+    4: ["-flip", "vertical"],
+    5: ["-transpose"],
+    6: ["-rotate", "90"],
+    7: ["-transverse"],
+    8: ["-rotate", "270"],
+}
+
+
+class TransposeSummary(TypedDict):
+    changed: list[str]
+    skipped: list[str]
+    errors: dict[str, str]
+
+
+def get_orientation(pic: str | Path) -> int:
+    """Reads the exif orientation of a picture. Only the header of the file is read"""
+    with Image.open(pic) as image:
+        return image.getexif().get(ORIENTATION_TAG, 1)
+
+
+def _reset_orientation_tag(pic: Path) -> None:
+    """Writes 1 (normal) on the exif orientation tag of a jpeg file without touching the image data"""
+    with pic.open("r+b") as f:
+        data = f.read(65536)
+        start = data.find(b"Exif\x00\x00")
+        if start < 0:
+            return
+        tiff = start + 6
+        endian = "<" if data[tiff:tiff + 2] == b"II" else ">"
+        ifd = tiff + struct.unpack(endian + "I", data[tiff + 4:tiff + 8])[0]
+        n_entries = struct.unpack(endian + "H", data[ifd:ifd + 2])[0]
+        for i in range(n_entries):
+            entry = ifd + 2 + i * 12
+            if struct.unpack(endian + "H", data[entry:entry + 2])[0] == ORIENTATION_TAG:
+                f.seek(entry + 8)
+                f.write(struct.pack(endian + "H", 1))
+                return
+
+
+def _jpegtran_transpose(pic: Path, orientation: int) -> bool:
+    jpegtran = shutil.which("jpegtran")
+    if jpegtran is None:
+        return False
+    tempfile = pic.with_name(f"{pic.name}.transposing")
+    args = [jpegtran, "-copy", "all", "-perfect", *JPEGTRAN_OPERATIONS[orientation], "-outfile", str(tempfile), str(pic)]
+    try:
+        # -perfect fails when the size is not a multiple of the jpeg blocks, in that case the
+        # picture is transposed by Pillow
+        if subprocess.run(args, capture_output=True).returncode != 0:
+            return False
+        _reset_orientation_tag(tempfile)
+        tempfile.replace(pic)
+        return True
+    finally:
+        tempfile.unlink(missing_ok=True)
+
+
+def exif_transpose_pic(pic: str | Path) -> bool:
+    """Rotates the picture according to its exif orientation. Jpeg files are rotated without
+    loss by jpegtran if it is installed. Returns False if the picture didn't need to be changed"""
     pic = Path(pic)
-    image = Image.open(pic)
-    image = ImageOps.exif_transpose(image)
-    image.save(pic)
+    orientation = get_orientation(pic)
+    if orientation not in JPEGTRAN_OPERATIONS:
+        return False
+    if pic.suffix.lower() in (".jpg", ".jpeg", ".jfif") and _jpegtran_transpose(pic, orientation):
+        return True
+    with Image.open(pic) as image:
+        format_ = image.format
+        transposed = ImageOps.exif_transpose(image)
+    tempfile = pic.with_name(f"{pic.name}.transposing")
+    try:
+        if format_ == "JPEG":
+            transposed.save(tempfile, format=format_, quality=95, exif=transposed.info.get("exif", b""))
+        else:
+            transposed.save(tempfile, format=format_)
+        tempfile.replace(pic)
+    finally:
+        tempfile.unlink(missing_ok=True)
+    return True
 
 
-def exif_transpose_folder(folder: str|Path, recursive=False, verbose=False) -> None:
+def _transpose_worker(pic: str) -> tuple[str, bool | None, str | None]:
+    try:
+        return pic, exif_transpose_pic(pic), None
+    except Exception as e:
+        return pic, None, str(e)
+
+
+def _transpose_many(pics: list[str], verbose=False, workers: int | None = None) -> TransposeSummary:
+    summary: TransposeSummary = {'changed': [], 'skipped': [], 'errors': {}}
+    if not pics:
+        return summary
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for pic, changed, error in executor.map(_transpose_worker, pics, chunksize=8):
+            if error is not None:
+                summary['errors'][pic] = error
+            elif changed:
+                summary['changed'].append(pic)
+            else:
+                summary['skipped'].append(pic)
+            if verbose:
+                print(f"Transposing file \"{pic}\": {error or ('changed' if changed else 'skipped')}")
+    return summary
+
+
+def _list_folder(folder: Path, recursive: bool) -> list[str]:
+    pics = []
+    for entry in folder.iterdir():
+        if entry.is_dir():
+            if recursive:
+                pics += _list_folder(entry, recursive)
+        else:
+            pics.append(str(entry))
+    return pics
+
+
+def exif_transpose_folder(folder: str | Path, recursive=False, verbose=False, workers: int | None = None) -> TransposeSummary:
+    """Transposes the pictures of a folder in a pool of processes. Returns which files were
+    changed, which were skipped for not needing rotation and the errors"""
     folder = Path(folder)
     if verbose:
         print(f"Transposing pictures of folder \"{folder}\"")
-    for entry in folder.iterdir():
-        if entry.is_dir() and recursive:
-            exif_transpose_folder(entry, recursive=True, verbose=verbose)
-        else:
-            try:
-                if verbose:
-                    print(f"Transposing file \"{entry}\"")
-                exif_transpose_pic(entry)
-            except Exception as e:
-                if verbose:
-                    print(e)
-
-def exif_transpose_pics(pics : list[list[str|Path]]|list[str|Path], verbose=False) -> None:
+    return _transpose_many(_list_folder(folder, recursive), verbose=verbose, workers=workers)
+
+
+def _flatten_pics(pics: list[list[str | Path]] | list[str | Path]) -> list[str]:
+    res: list[str] = []
     for item in pics:
         if isinstance(item, list):
-            exif_transpose_pics(item, verbose=verbose)
+            res += _flatten_pics(item)
         else:
-            pic = Path(item)
-            if verbose:
-                    print(f"Transposing file \"{pic}\"")
-            exif_transpose_pic(pic)
+            res.append(str(item))
+    return res
+
+
+def exif_transpose_pics(pics: list[list[str | Path]] | list[str | Path], verbose=False, workers: int | None = None) -> TransposeSummary:
+    return _transpose_many(_flatten_pics(pics), verbose=verbose, workers=workers)
@@ -1,7 +1,7 @@
 from pathlib import Path
 from jinja2 import Template
 from bs4 import BeautifulSoup
-from report_writer.doc_handler.jenv import make_jinja_env
+from report_writer.doc_handler.jenv import get_jinja_env
 from report_writer.module_model import ModuleModel
 
 def remove_extra_spaces(text):
@@ -13,7 +13,7 @@ def render_pre_html(module_model: ModuleModel, context: dict) -> None:
     pre_file = module_model.pre_html_file
     if pre_file.exists():
        text = pre_file.read_text(encoding="utf-8")
-       jinja_env = make_jinja_env(module_model)
+       jinja_env = get_jinja_env(module_model)
        tm = jinja_env.from_string(text)
        html = tm.render(**context)
        soup = BeautifulSoup(html, 'html.parser')
@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+from report_writer.file_cache import FileCache
+from report_writer.types import ModelListItem
+
+
+class ParsedList:
+    """Items of a list file of a model and a map of the items by key"""
+    __slots__ = ('items', 'by_key')
+
+    def __init__(self, path: Path) -> None:
+        items: list[ModelListItem] = []
+        if path.suffix == ".txt":
+            text = path.read_text(encoding="utf-8").strip()
+            items = [{'key': line, 'value': line} for line in text.split("\n")]
+        elif path.suffix == ".json":
+            with path.open("r", encoding="utf-8") as f:
+                items = json.load(f)
+        self.items = items
+        self.by_key: dict[str, ModelListItem] = {}
+        for item in items:
+            # Items without a key are kept in the list, like before, but can't be found by key
+            if isinstance(item, dict) and 'key' in item:
+                # The first item wins when keys repeat, the same the linear search returned
+                self.by_key.setdefault(item['key'], item)
+
+
+# The lists are shared by every form of the model, they must not be modified
+lists_cache: FileCache[ParsedList] = FileCache(ParsedList, maxsize=256)
+
+
+def find_list_file(folder: Path, list_name: str) -> Path | None:
+    for suffix in (".txt", ".json"):
+        path = folder / f"{list_name}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def list_files(folder: Path) -> dict[str, Path]:
+    """Files of the lists of the folder by list name"""
+    if not folder.exists():
+        return {}
+    names = {entry.stem for entry in folder.iterdir() if not entry.is_dir()}
+    files = {name: find_list_file(folder, name) for name in names}
+    return {name: path for name, path in files.items() if path is not None}
+
+
+def load_list(folder: Path, list_name: str) -> ParsedList | None:
+    """Returns the parsed list, reading the file only the first time or when it changes"""
+    path = find_list_file(folder, list_name)
+    if path is None:
+        return None
+    try:
+        return lists_cache.get(path)
+    except FileNotFoundError:
+        return None
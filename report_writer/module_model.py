@@ -1,4 +1,6 @@
-
+import os
+import sys
+import threading
 from typing import Any, Type
 from .types import ModelNotFoundError
 from importlib.machinery import SourceFileLoader
@@ -6,6 +8,26 @@ from pathlib import Path
 from report_writer.base_web_form import BaseWebForm
 from report_writer.model_info import ModelInfo
 
+
+def get_folder_version(folder: str | Path) -> str:
+    """Returns a signature of the files inside a folder that changes whenever a file is added,
+    removed or modified"""
+    latest = 0
+    count = 0
+    size = 0
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        for name in files:
+            try:
+                st = os.stat(os.path.join(root, name))
+            except FileNotFoundError:
+                continue
+            latest = max(latest, st.st_mtime_ns)
+            count += 1
+            size += st.st_size
+    return f"{latest:x}-{count:x}-{size:x}"
+
+
 class ModuleModel:
     def __init__(self, models_folder: str | Path, model_name: str) -> None:
         self.model_folder = Path(models_folder) / model_name
@@ -13,8 +35,20 @@ class ModuleModel:
         self.path = self.model_folder / "__init__.py"
         if not self.path.exists():
             raise ModelNotFoundError(f"Model \"{model_name}\" not found")
+        self.version = get_folder_version(self.model_folder)
+        # Objects derived from the model (jinja envs, layouts...). They live as long as this
+        # version of the model stays in the registry
+        self.cache: dict[str, Any] = {}
+        self._unload_module()
         self.module = SourceFileLoader(model_name, str(self.path)).load_module()
 
+    def _unload_module(self) -> None:
+        """Removes the model package and its submodules from sys.modules so a new load
+        executes web_form, filters, functions and pre again"""
+        prefix = f"{self.model_name}."
+        for name in [n for n in sys.modules if n == self.model_name or n.startswith(prefix)]:
+            del sys.modules[name]
+
     def get_web_form(self) -> BaseWebForm:
         return self.module.web_form.Form()
 
@@ -42,4 +76,56 @@ class ModuleModel:
         return self.model_folder / "pre.html"
 
     def pre(self, context: Any) -> None:
-        self.module.pre.pre(context)
\ No newline at end of file
+        self.module.pre.pre(context)
+
+
+class ModelRegistry:
+    """Process wide cache of loaded models. A model is loaded again only when
+    some file inside its folder changes"""
+
+    def __init__(self) -> None:
+        self._models: dict[tuple[str, str], ModuleModel] = {}
+        self._lock = threading.RLock()
+        # Models are loaded one at a time, the lookups don't wait for it
+        self._load_lock = threading.Lock()
+
+    def get(self, models_folder: str | Path, model_name: str) -> ModuleModel:
+        key = (str(Path(models_folder).absolute()), model_name)
+        # The folder is scanned without holding the lock
+        version = get_folder_version(Path(key[0]) / model_name)
+        with self._lock:
+            module_model = self._models.get(key)
+        if module_model is not None and module_model.version == version:
+            return module_model
+        with self._load_lock:
+            with self._lock:
+                module_model = self._models.get(key)
+            # Another thread may have loaded it while this one waited
+            if module_model is not None and module_model.version == version:
+                return module_model
+            try:
+                module_model = ModuleModel(models_folder, model_name)
+            except ModelNotFoundError:
+                with self._lock:
+                    self._models.pop(key, None)
+                raise
+            with self._lock:
+                self._models[key] = module_model
+            return module_model
+
+    def invalidate(self, models_folder: str | Path | None = None, model_name: str | None = None) -> None:
+        """Discards the cached models. If no param is passed the whole registry is cleared"""
+        with self._lock:
+            for key in list(self._models.keys()):
+                if models_folder is not None and key[0] != str(Path(models_folder).absolute()):
+                    continue
+                if model_name is not None and key[1] != model_name:
+                    continue
+                del self._models[key]
+
+
+registry = ModelRegistry()
+
+
+def get_module_model(models_folder: str | Path, model_name: str) -> ModuleModel:
+    return registry.get(models_folder, model_name)
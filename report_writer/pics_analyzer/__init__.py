@@ -1,6 +1,10 @@
+from collections import OrderedDict
+import copy
+import os
 from pathlib import Path
 import re
-from typing import TypedDict, Optional, Union
+import threading
+from typing import Any, TypedDict, Optional, Union
 from report_writer.types import CaseObjectsType, ObjectType
 
 
@@ -12,8 +16,7 @@ class AnalyzedPicInfo(TypedDict):
 
 
 class NameAnalyzer:
-    def __init__(self):
-        self.reg = re.compile(r'((^[A-Za-z]+)(\d+))(?:[\d\.\-]+)?(?:_(\d+))?$')
+    reg = re.compile(r'((^[A-Za-z]+)(\d+))(?:[\d\.\-]+)?(?:_(\d+))?$')
 
     def analise_name(self, name) -> Optional[AnalyzedPicInfo]:
         res = self.reg.search(name)
@@ -29,29 +32,96 @@ class NameAnalyzer:
             return ret
 
 
-def get_objects_from_pics(folder: Union[Path, str], default_object_type: Optional[str]=None) -> CaseObjectsType:
-    folder = Path(folder)
-    objects = CaseObjectsType(folder)
+_digits = re.compile(r'(\d+)')
+
+
+def natural_key(text: str) -> list[Any]:
+    """Sort key that puts "foto2" before "foto10" """
+    return [int(part) if part.isdigit() else part.lower() for part in _digits.split(text)]
+
+
+def _scan(folder: str, relpath: str, recursive: bool, entries: list[tuple[str, str, str]], dirs: dict[str, int]) -> None:
+    """Lists the folder in a single pass filling entries with (relative path, stem, absolute path)
+    and dirs with the mtime of every folder visited"""
+    dirs[folder] = os.stat(folder).st_mtime_ns
+    with os.scandir(folder) as it:
+        for entry in it:
+            rel = f"{relpath}{entry.name}"
+            if recursive and entry.is_dir():
+                _scan(entry.path, f"{rel}/", recursive, entries, dirs)
+                continue
+            entries.append((rel, os.path.splitext(entry.name)[0], os.path.abspath(entry.path)))
+
+
+def _classify(folder: Path, default_object_type: Optional[str], recursive: bool) -> tuple[dict, dict[str, int]]:
+    entries: list[tuple[str, str, str]] = []
+    dirs: dict[str, int] = {}
+    _scan(str(folder), "", recursive, entries, dirs)
     analyzer = NameAnalyzer()
+    alias = ""
     obj_map: dict[str, ObjectType] = {}
-    for entry in folder.iterdir():
-        if entry.name.startswith("_"):
+    for rel, stem, abspath in entries:
+        if os.path.basename(rel).startswith("_"):
             continue
-        res = analyzer.analise_name(entry.stem)
+        res = analyzer.analise_name(stem)
         if not res:
             continue
-        if objects.alias and res['alias'] != objects.alias:
-            objects = CaseObjectsType(folder)
-            objects.pics_not_classified = [entry.name for entry in folder.iterdir()]
-            return objects
-        objects.alias = res['alias']
+        if alias and res['alias'] != alias:
+            # Mixed aliases, nothing is classified
+            objects = CaseObjectsType(folder, objects=[], pics_not_classified=sorted((e[0] for e in entries), key=natural_key))
+            return objects.to_dict(), dirs
+        alias = res['alias']
         try:
-            obj_map[res['obj_number']].pics.append(str(entry.absolute()))
+            obj_map[res['obj_number']].pics.append(abspath)
         except KeyError:
-            name = res['obj_number']
-            obj = ObjectType(name=name, pics=[str(entry.absolute())])
-            
-            obj.type = default_object_type or ""
-            obj_map[res['obj_number']] = obj
-    objects.objects = [obj for obj in obj_map.values()]
-    return objects
+            obj_map[res['obj_number']] = ObjectType(type=default_object_type or "", name=res['obj_number'], pics=[abspath])
+    objs = sorted(obj_map.values(), key=lambda obj: natural_key(obj.name))
+    for obj in objs:
+        obj.pics.sort(key=natural_key)
+    return CaseObjectsType(folder, objects=objs, pics_not_classified=[], alias=alias).to_dict(), dirs
+
+
+class PicsIndex:
+    """Keeps the classification of folders, a folder is analysed again only when the mtime of it
+    or of one of its subfolders changes (files added, removed or renamed)"""
+
+    def __init__(self, maxsize: int = 64) -> None:
+        self.maxsize = maxsize
+        self._items: OrderedDict[tuple[str, str, bool], tuple[dict[str, int], dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _is_valid(self, dirs: dict[str, int]) -> bool:
+        try:
+            return all(os.stat(d).st_mtime_ns == mtime for d, mtime in dirs.items())
+        except FileNotFoundError:
+            return False
+
+    def get(self, folder: Path, default_object_type: Optional[str], recursive: bool) -> dict:
+        key = (str(folder.absolute()), default_object_type or "", recursive)
+        with self._lock:
+            item = self._items.get(key)
+        if item is not None and self._is_valid(item[0]):
+            return item[1]
+        data, dirs = _classify(folder, default_object_type, recursive)
+        with self._lock:
+            self._items[key] = (dirs, data)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return data
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+pics_index = PicsIndex()
+
+
+def get_objects_from_pics(folder: Union[Path, str], default_object_type: Optional[str] = None, recursive=False) -> CaseObjectsType:
+    """Groups the pictures of the folder in objects by their names (ex: "ap1_1.jpg" and "ap1_2.jpg"
+    belong to object "1"). Objects and pictures are sorted in natural order. If the pictures have
+    different aliases nothing is classified and all files go to pics_not_classified"""
+    folder = Path(folder)
+    data = copy.deepcopy(pics_index.get(folder, default_object_type, recursive))
+    return CaseObjectsType(folder).from_dict(data)
@@ -0,0 +1,128 @@
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+import threading
+import time
+import tracemalloc
+from typing import Callable, ContextManager, Iterator, TypedDict
+
+
+class PhaseInfo(TypedDict):
+    name: str
+    depth: int
+    calls: int
+    seconds: float
+    # Bytes allocated above the memory in use when the phase started, None if memory is not traced.
+    # tracemalloc traces the whole process, renders running at the same time add to each other's peaks
+    peak_memory: int | None
+
+
+# tracemalloc is global, it is started by the first active profile and stopped by the last one
+_tracing_lock = threading.Lock()
+_tracing_profiles = 0
+_started_tracing = False
+
+
+def _start_tracing() -> None:
+    global _tracing_profiles, _started_tracing
+    with _tracing_lock:
+        if _tracing_profiles == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_profiles += 1
+
+
+def _stop_tracing() -> None:
+    global _tracing_profiles, _started_tracing
+    with _tracing_lock:
+        _tracing_profiles -= 1
+        if _tracing_profiles == 0 and _started_tracing:
+            # Tracing started by someone else is left running
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+class RenderProfile:
+    """Wall time and peak memory of each phase of a render. Phases with the same name, like the
+    calls to a subdoc inside a loop, are added up keeping the largest peak"""
+
+    def __init__(self, memory: bool = True, on_phase: Callable[[str | None], None] | None = None) -> None:
+        self.memory = memory
+        # Called with the name of the phase running whenever it changes, None when the last one ends
+        self.on_phase = on_phase
+        self.phases: dict[str, PhaseInfo] = {}
+        # [memory in use when the phase started, largest peak seen by the phases inside it]
+        self._stack: list[list[int]] = []
+        self._names: list[str] = []
+
+    @contextmanager
+    def activate(self) -> Iterator['RenderProfile']:
+        """Makes the phases called by profile_phase during the block be recorded in this profile"""
+        if self.memory:
+            _start_tracing()
+        token = _current_profile.set(self)
+        try:
+            yield self
+        finally:
+            _current_profile.reset(token)
+            if self.memory:
+                _stop_tracing()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        # Registered when the phase starts so the phases are listed in the order they started
+        info = self.phases.get(name)
+        if info is None:
+            info = self.phases[name] = {'name': name, 'depth': len(self._stack), 'calls': 0, 'seconds': 0.0, 'peak_memory': None}
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1][1] = max(self._stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            self._stack.append([current, current])
+        else:
+            self._stack.append([0, 0])
+        self._names.append(name)
+        if self.on_phase is not None:
+            self.on_phase(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._names.pop()
+            if self.on_phase is not None:
+                self.on_phase(self._names[-1] if self._names else None)
+            info['calls'] += 1
+            info['seconds'] += time.perf_counter() - start
+            started_with, inner_peak = self._stack.pop()
+            if self.memory:
+                # Another render may have reset the peak in the meantime, the memory in use now is
+                # still a lower bound
+                peak = max(*tracemalloc.get_traced_memory(), inner_peak)
+                info['peak_memory'] = max(info['peak_memory'] or 0, peak - started_with, 0)
+                if self._stack:
+                    self._stack[-1][1] = max(self._stack[-1][1], peak)
+
+    def to_list(self) -> list[PhaseInfo]:
+        """Phases in the order they started, each inner phase after the phase that called it"""
+        return [PhaseInfo(**info) for info in self.phases.values()]
+
+    def format(self) -> str:
+        lines = [f"{'phase':<50} {'calls':>6} {'time (ms)':>12} {'peak (MiB)':>11}"]
+        for info in self.to_list():
+            name = "  " * info['depth'] + info['name']
+            peak = "-" if info['peak_memory'] is None else f"{info['peak_memory'] / 1024 / 1024:.1f}"
+            lines.append(f"{name:<50} {info['calls']:>6} {info['seconds'] * 1000:>12.1f} {peak:>11}")
+        if self.memory:
+            lines.append("peaks are of the whole process, they include renders running at the same time")
+        return "\n".join(lines)
+
+
+_current_profile: ContextVar[RenderProfile | None] = ContextVar("current_profile", default=None)
+
+
+def profile_phase(name: str) -> ContextManager[None]:
+    """Records the block as a phase of the active profile, does nothing if no profile is active"""
+    profile = _current_profile.get()
+    if profile is None:
+        return nullcontext()
+    return profile.phase(name)
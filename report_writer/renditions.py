@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import os
+from typing import Iterable
+from uuid import uuid4
+from PIL import Image, ImageOps
+
+# Name of each rendition and the maximum size of its larger side
+RENDITIONS: dict[str, int] = {
+    'thumb': 256,
+    'preview': 1024
+}
+RENDITIONS_FOLDER = ".renditions"
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="renditions")
+
+
+class RenditionNotFoundError(Exception):
+    pass
+
+
+def rendition_path(path: Path, size: str) -> Path:
+    """Renditions are stored in a hidden folder next to the original file"""
+    return path.parent / RENDITIONS_FOLDER / size / f"{path.name}.jpg"
+
+
+def make_rendition(path: str | Path, size: str) -> Path | None:
+    """Creates the rendition of the picture if it doesn't exist or is older than the picture.
+    Returns None if the file is not a picture Pillow can read"""
+    path = Path(path)
+    try:
+        max_size = RENDITIONS[size]
+    except KeyError:
+        raise RenditionNotFoundError(f"rendition \"{size}\" does not exist")
+    dest = rendition_path(path, size)
+    try:
+        if dest.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+            return dest
+    except FileNotFoundError:
+        pass
+    try:
+        with Image.open(path) as original:
+            original.draft("RGB", (max_size, max_size))
+            image = ImageOps.exif_transpose(original)
+            image.thumbnail((max_size, max_size))
+            image = image.convert("RGB")
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tempfile = dest.with_name(f"{uuid4()}.tmp")
+        image.save(tempfile, format="JPEG", quality=80)
+        os.replace(tempfile, dest)
+        return dest
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+def make_renditions(paths: Iterable[str | Path]) -> None:
+    for path in paths:
+        for size in RENDITIONS:
+            make_rendition(path, size)
+
+
+def make_renditions_in_background(paths: Iterable[str | Path]) -> None:
+    """Schedules the creation of all renditions of the pictures"""
+    _executor.submit(make_renditions, list(paths))
+
+
+def delete_renditions(path: str | Path) -> None:
+    path = Path(path)
+    for size in RENDITIONS:
+        rendition_path(path, size).unlink(missing_ok=True)
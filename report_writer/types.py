@@ -1,6 +1,7 @@
 from pathlib import Path
 from typing import IO, Any, Callable, Literal, TypedDict, TYPE_CHECKING
 from shutil import copyfileobj
+from report_writer.profiling import PhaseInfo
 
 if TYPE_CHECKING:
     from report_writer.base_web_form import BaseWebForm
@@ -124,6 +125,24 @@ class ModelMetaType(TypedDict):
     has_web_form: bool
 
 
+class _RenderItemRequired(TypedDict):
+    data: dict
+    dest_file: str | Path
+
+
+class RenderItem(_RenderItemRequired, total=False):
+    random_id: str
+    profile: bool
+
+
+class RenderResult(TypedDict):
+    dest_file: str
+    errors: ErrorsType
+    exception: str | None
+    # Time and memory of each phase when the item asked for profile
+    profile: list[PhaseInfo] | None
+
+
 class FileType:
     def __init__(self, file: IO[bytes], filename: str) -> None:
         self.file = file
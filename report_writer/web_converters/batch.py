@@ -0,0 +1,26 @@
+from typing import Any, Callable, TYPE_CHECKING
+from report_writer.types import ValidationError
+
+if TYPE_CHECKING:
+    from report_writer.base_web_form import BaseWebForm
+
+
+def convert_unique(convert: Callable[['BaseWebForm', Any], Any], form: 'BaseWebForm', values: list[Any]) -> tuple[list[Any], dict[int, str]]:
+    """Converts a column of values calling convert once for each distinct value. Returns the
+    converted values (None where the conversion failed) and the errors by index"""
+    converted: dict[Any, tuple[Any, str | None]] = {}
+    results: list[Any] = []
+    errors: dict[int, str] = {}
+    for i, value in enumerate(values):
+        try:
+            result, error = converted[value]
+        except KeyError:
+            try:
+                result, error = convert(form, value), None
+            except ValidationError as e:
+                result, error = None, str(e)
+            converted[value] = result, error
+        results.append(result)
+        if error is not None:
+            errors[i] = error
+    return results, errors
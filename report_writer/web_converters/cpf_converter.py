@@ -1,5 +1,6 @@
 from report_writer.types import ValidationError
-from typing import TYPE_CHECKING
+from report_writer.web_converters.batch import convert_unique
+from typing import Any, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from report_writer.base_web_form import BaseWebForm
@@ -17,4 +18,8 @@ class CpfConverter:
             digit = ((aux * 10) % 11) % 10
             if digit != cpf[i]:
                 raise ValidationError("CPF inválido")
-        return f"{cpf[:2]}.{cpf[3:5]}.{cpf[6:8]}-{cpf[9:10]}"        
+        return f"{cpf[:2]}.{cpf[3:5]}.{cpf[6:8]}-{cpf[9:10]}"
+
+    def convert_many(self, form: 'BaseWebForm', values: list[str]) -> tuple[list[Any], dict[int, str]]:
+        """Converts a column of values. Returns the converted values and the errors by index"""
+        return convert_unique(self, form, values)
@@ -1,10 +1,15 @@
 from datetime import datetime
+import re
 from report_writer.types import ValidationError
-from typing import TYPE_CHECKING
+from report_writer.web_converters.batch import convert_unique
+from typing import Any, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from report_writer.base_web_form import BaseWebForm
 
+_dmy = re.compile(r"([0-9]{1,2})/([0-9]{1,2})/([0-9]{4})")
+
+
 class DateConverter:
     def __init__(self, format="%d/%m/%Y") -> None:
         self.format = format
@@ -13,4 +18,20 @@ class DateConverter:
         try:
             return datetime.strptime(value, self.format)
         except:
-            raise ValidationError("Data inválida")
\ No newline at end of file
+            raise ValidationError("Data inválida")
+
+    def _convert_fast(self, form: 'BaseWebForm', value: str) -> datetime:
+        # datetime() accepts and rejects the same "%d/%m/%Y" dates as strptime, but much faster
+        match = _dmy.fullmatch(value)
+        if match is None:
+            return self(form, value)
+        try:
+            return datetime(int(match[3]), int(match[2]), int(match[1]))
+        except ValueError:
+            raise ValidationError("Data inválida")
+
+    def convert_many(self, form: 'BaseWebForm', values: list[str]) -> tuple[list[Any], dict[int, str]]:
+        """Converts a column of values. Returns the dates and the errors by index"""
+        if self.format == "%d/%m/%Y":
+            return convert_unique(self._convert_fast, form, values)
+        return convert_unique(self, form, values)
@@ -1,5 +1,6 @@
 from report_writer.types import ValidationError
-from typing import TYPE_CHECKING
+from report_writer.web_converters.batch import convert_unique
+from typing import Any, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from report_writer.base_web_form import BaseWebForm
@@ -19,4 +20,8 @@ class FloatConverter:
             raise ValidationError(f"O valor precisa ser maior ou igual a {str(self.min).replace(',', '.')}")
         if self.max and val > self.max:
             raise ValidationError(f"O valor precisa ser menor ou igual a {str(self.max).replace(',', '.')}")
-        return val
\ No newline at end of file
+        return val
+
+    def convert_many(self, form: 'BaseWebForm', values: list[str]) -> tuple[list[Any], dict[int, str]]:
+        """Converts a column of values. Returns the converted values and the errors by index"""
+        return convert_unique(self, form, values)
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Any, IO, Optional, Tuple, TYPE_CHECKING
+from typing import Any, IO, Optional, Sequence, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from report_writer.base_web_form import BaseWebForm
@@ -10,7 +10,11 @@ import stringcase
 from report_writer.widgets.composite_widget import CompositeWidget
 
 
+_missing = object()
+
+
 class ArrayWidget:
+    __slots__ = ('form', 'name', 'col', 'required', 'label', 'validators', 'converter', 'widgets', 'composite', 'columns')
 
     def __init__(self, form: 'BaseWebForm',
                  name: str,
@@ -29,23 +33,63 @@ class ArrayWidget:
         self.converter = converter
         self.widgets = widgets
         self.composite = CompositeWidget(self.widgets)
+        self.columns: list[Widget] = [w for row in widgets for w in row]
 
     @staticmethod
-    def save_widget_assets(widget_folder: Path, files: list[FileType]) -> Any:
+    def save_widget_assets(widget_folder: Path, files: list[FileType], append: bool = False) -> Any:
         pass
 
     def get_update_data(self, payload: Any) -> Any:
         pass
 
     def convert_data(self, raw_data: Any) -> Tuple[list, ErrorsType]:
-        data = []
+        """Converts the array column by column, widgets with a convert_many method convert all the
+        values of their field at once. Errors are reported by item index"""
+        items = list(raw_data)
+        data: list[dict] = [{} for _ in items]
         errors: dict = {}
-        for i, item in enumerate(list(raw_data)):
-            d, e = self.composite.convert_data(item)
-            data.append(d)
-            if e is not None:
-                errors[i] = e
-        er = errors or None
+        all_indexes = range(len(items))
+        for w in self.columns:
+            name = w.name
+            try:
+                values = [item[name] for item in items]
+                indexes: Sequence[int] = all_indexes
+            except KeyError:
+                values, indexes = [], []
+                for i, item in enumerate(items):
+                    if name in item:
+                        values.append(item[name])
+                        indexes.append(i)
+                    else:
+                        errors.setdefault(i, {})[name] = "missing field"
+            convert_many = getattr(w, "convert_many", None)
+            column: Tuple[list, dict] | None = None
+            if convert_many is not None:
+                try:
+                    column = convert_many(values)
+                except KeyError:
+                    # A converter or validator of the model failed, the values are converted one
+                    # by one so only the items that fail get "missing field"
+                    column = None
+            if column is not None:
+                results, column_errors = column
+            else:
+                results, column_errors = [], {}
+                for j, value in enumerate(values):
+                    try:
+                        result, e = w.convert_data(value)
+                    except KeyError:
+                        # Like CompositeWidget, the field is left out of the item
+                        result, e = _missing, "missing field"
+                    results.append(result)
+                    if e is not None:
+                        column_errors[j] = e
+            for i, result in zip(indexes, results):
+                if result is not _missing:
+                    data[i][name] = result
+            for j, e in column_errors.items():
+                errors.setdefault(indexes[j], {})[name] = e
+        er = {i: errors[i] for i in sorted(errors)} or None
         return data, er
 
     def get_layout(self) -> WidgetAttributesType:
@@ -7,6 +7,7 @@ import stringcase
 
 
 class CheckBoxWidget:
+    __slots__ = ('form', 'name', 'col', 'default', 'label', 'validators', 'converter')
 
     def __init__(self, form: 'BaseWebForm',
                  name: str,
@@ -23,7 +24,7 @@ class CheckBoxWidget:
         self.converter = converter
 
     @staticmethod
-    def save_widget_assets(widget_folder: Path, files: list[FileType]) -> Any:
+    def save_widget_assets(widget_folder: Path, files: list[FileType], append: bool = False) -> Any:
         pass
 
     def get_update_data(self, payload: Any) -> Any:
@@ -31,16 +32,16 @@ class CheckBoxWidget:
 
     def convert_data(self, raw_data: Any) -> Tuple[Any, ErrorsType]:
         try:
-            self.data = self.converter(self.form, 
+            data = self.converter(self.form, 
                 raw_data) if self.converter else raw_data
         except ValidationError as e:
             return None, str(e)
         for v in self.validators:
             try:
-                v(self.form, self.data)
+                v(self.form, data)
             except ValidationError as e:
                 return None, str(e)
-        return self.data, None
+        return data, None
 
     def get_layout(self) -> WidgetAttributesType:
         return {
@@ -0,0 +1,49 @@
+from typing import Any, Optional, Tuple, TYPE_CHECKING
+from report_writer.types import ConverterType, ValidationError, ValidatorType
+
+if TYPE_CHECKING:
+    from report_writer.base_web_form import BaseWebForm
+
+
+def convert_text_column(form: 'BaseWebForm', raw_values: list[Any], required: bool,
+                        converter: Optional[ConverterType], validators: list[ValidatorType]) -> Tuple[list[Any], dict[int, str]]:
+    """Converts the values of a text field in all items of an array at once, with the same rules of
+    the convert_data of the text widgets. Converters that have a convert_many method receive the
+    whole column. Returns the values and the errors by index"""
+    texts = [str(value).strip() for value in raw_values]
+    results: list[Any] = [None] * len(texts)
+    errors: dict[int, str] = {}
+    pending = list(range(len(texts)))
+    if required:
+        pending = [i for i in pending if texts[i] != ""]
+        errors = {i: "Campo obrigatório" for i, text in enumerate(texts) if text == ""}
+    if converter is None:
+        for i in pending:
+            results[i] = texts[i]
+    elif hasattr(converter, "convert_many"):
+        values, conversion_errors = converter.convert_many(form, [texts[i] for i in pending])  # type: ignore
+        for j, i in enumerate(pending):
+            results[i] = values[j]
+        for j, error in conversion_errors.items():
+            errors[pending[j]] = error
+        pending = [i for j, i in enumerate(pending) if j not in conversion_errors]
+    else:
+        converted = []
+        for i in pending:
+            try:
+                results[i] = converter(form, texts[i])
+                converted.append(i)
+            except ValidationError as e:
+                errors[i] = str(e)
+        pending = converted
+    for v in validators:
+        valid = []
+        for i in pending:
+            try:
+                v(form, results[i])
+                valid.append(i)
+            except ValidationError as e:
+                results[i] = None
+                errors[i] = str(e)
+        pending = valid
+    return results, errors
@@ -1,24 +1,27 @@
-from typing import Any, Optional, Tuple
+from typing import Any, Callable, Optional, Tuple
 from report_writer.types import  ErrorsType
 from report_writer.widgets import Widget
 
 
 class CompositeWidget:
+    __slots__ = ('widgets', 'fields')
 
     def __init__(self, widgets: list[list[Widget]]) -> None:
         self.widgets = widgets
+        # Conversion plan: the name and the converter of each field in the order of the layout
+        self.fields: list[tuple[str, Callable[[Any], Tuple[Any, ErrorsType]]]] = [
+            (w.name, w.convert_data) for row in widgets for w in row]
 
     def convert_data(self, raw_data: dict) -> Tuple[Any, ErrorsType]:
         context = {}
         errors: dict = {}
-        for row in self.widgets:
-            for w in row:
-                try:
-                    context[w.name], e = w.convert_data(raw_data[w.name])
-                    if e is not None:
-                        errors[w.name] = e
-                except KeyError:
-                    errors[w.name] = "missing field"
+        for name, convert in self.fields:
+            try:
+                context[name], e = convert(raw_data[name])
+                if e is not None:
+                    errors[name] = e
+            except KeyError:
+                errors[name] = "missing field"
         e = errors if errors != {} else None
         return context, e
 
@@ -7,6 +7,7 @@ import stringcase
 
 
 class FileWidget:
+    __slots__ = ('form', 'name', 'col', 'default', 'required', 'label', 'validators', 'converter', 'file_parser', 'accept')
 
     def __init__(self, form: 'BaseWebForm',
                  name: str,
@@ -29,7 +30,7 @@ class FileWidget:
         self.accept = accept
 
     @staticmethod
-    def save_widget_assets(widget_folder: Path, files: list[FileType]) -> Any:
+    def save_widget_assets(widget_folder: Path, files: list[FileType], append: bool = False) -> Any:
         try:
             widget_folder.mkdir(parents=True)
         except FileExistsError:
@@ -50,20 +51,20 @@ class FileWidget:
         text = str(raw_data).strip()
         if self.required and text == "":
             return None, "Campo obrigatório"
-        data = self.form.report_writer.get_widget_assets_folder(self.name, create=True) / text
-        print(data)
-        if not data.exists():
+        path = self.form.report_writer.get_widget_assets_folder(self.name, create=True) / text
+        print(path)
+        if not path.exists():
             return None, "Campo obrigatório"
         try:
-            self.data = self.converter(self.form, text) if self.converter else text
+            data = self.converter(self.form, text) if self.converter else text
         except ValidationError as e:
             return None, str(e)
         for v in self.validators:
             try:
-                v(self.form, self.data)
+                v(self.form, data)
             except ValidationError as e:
                 return None, str(e)
-        return self.data, None
+        return data, None
 
     def get_layout(self) -> WidgetAttributesType:
         return {
@@ -1,11 +1,15 @@
 import shutil
-from typing import IO, Any, Optional, Tuple, TYPE_CHECKING, TypedDict
+from typing import IO, Any, Optional, Tuple, TYPE_CHECKING, TypedDict, cast
 
 from pathlib import Path
 
 if TYPE_CHECKING:
     from report_writer.base_web_form import BaseWebForm
 from report_writer.types import ConverterType, ErrorsType, FileType, ValidatorType, WidgetAttributesType, ValidationError
+from report_writer.renditions import make_renditions_in_background
+from report_writer.zipmodel import extract_flat
+from report_writer.file_cache import file_hash, hashes_cache
+from uuid import uuid4
 import stringcase
 
 
@@ -20,6 +24,7 @@ class ObjectData(TypedDict):
 
 
 class ObjectsPicsWidget:
+    __slots__ = ('col', 'form', 'name', 'multiple', 'label', 'new_object_name', 'validators', 'converter')
 
     def __init__(self, form: 'BaseWebForm',
                  name: str,
@@ -56,38 +61,96 @@ class ObjectsPicsWidget:
 
 
     @staticmethod
-    def save_widget_assets(widget_folder: Path, files: list[FileType]) -> Any:
+    def _free_path(folder: Path, name: str) -> Path:
+        """Path for a file named name in folder, with a suffix if the name is already used"""
+        dest, i = folder / name, 1
+        while dest.exists():
+            dest = folder / f"{Path(name).stem}_{i}{Path(name).suffix}"
+            i += 1
+        return dest
+
+    @staticmethod
+    def _save_uploads(folder: Path, files: list[FileType]) -> list[Path]:
+        """Saves the uploaded files and the files of the zip archives in folder, files with the same
+        name get a suffix. Returns the files saved"""
+        saved: list[Path] = []
+        for f in files:
+            if f.filename.lower().endswith(".zip"):
+                saved += extract_flat(f.file, folder)
+            else:
+                dest = ObjectsPicsWidget._free_path(folder, f.filename)
+                with dest.open("xb") as fd:
+                    shutil.copyfileobj(f.file, fd)
+                saved.append(dest)
+        return saved
+
+    @staticmethod
+    def _merge_widget_assets(widget_folder: Path, files: list[FileType]) -> list[Path]:
+        """Adds the uploaded files to the folder skipping the ones whose content is already there.
+        Returns the files added"""
+        known = {hashes_cache.get(entry) for entry in widget_folder.iterdir() if entry.is_file()}
+        staging = widget_folder / f".upload_{uuid4()}"
+        staging.mkdir()
+        added: list[Path] = []
+        try:
+            for path in ObjectsPicsWidget._save_uploads(staging, files):
+                digest = file_hash(path)
+                if digest in known:
+                    continue
+                known.add(digest)
+                # A different picture with a name already used gets a suffix
+                dest = ObjectsPicsWidget._free_path(widget_folder, path.name)
+                path.replace(dest)
+                added.append(dest)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return added
+
+    @staticmethod
+    def save_widget_assets(widget_folder: Path, files: list[FileType], append: bool = False) -> Any:
+        """Saves the pictures uploaded replacing the previous ones. With append=True the pictures are
+        added to the existing ones, skipping those with the same content of a picture already saved"""
+        folder = widget_folder
+        if append:
+            folder.mkdir(parents=True, exist_ok=True)
+            make_renditions_in_background(ObjectsPicsWidget._merge_widget_assets(folder, files))
+            return ObjectsPicsWidget.get_data_from_folder(widget_folder)
+        # The upload is saved and validated apart, the previous pictures are only replaced when
+        # it succeeds
+        staging = widget_folder.with_name(f".{widget_folder.name}_upload_{uuid4()}")
+        staging.mkdir(parents=True)
+        try:
+            saved = ObjectsPicsWidget._save_uploads(staging, files)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        previous = widget_folder.with_name(f".{widget_folder.name}_previous_{uuid4()}")
         try:
-            shutil.rmtree(widget_folder)
+            widget_folder.replace(previous)
         except FileNotFoundError:
             pass
-        folder = widget_folder
-        folder.mkdir(parents=True)
-        for f in files:
-            if f.filename.endswith(".zip"):
-                pass
-            else:
-                f.save(folder)
+        staging.replace(widget_folder)
+        shutil.rmtree(previous, ignore_errors=True)
+        make_renditions_in_background(widget_folder / path.name for path in saved)
         return ObjectsPicsWidget.get_data_from_folder(widget_folder)
 
     def convert_data(self, raw_data: Any) -> Tuple[Any, ErrorsType]:
-        data: list[ObjectData] = raw_data
         folder = self.form.report_writer.get_widget_assets_folder(
             self.name, create=True)
-        for i, obj in enumerate(data):
-            data[i]['pics'] = [{'path': str(
-                folder / pic['path']), 'selected': pic['selected']} for pic in obj['pics']]
+        # New objects, the payload is not modified. Other keys of the objects are kept
+        data: list[ObjectData] = [cast(ObjectData, {**obj, 'pics': [{'path': str(
+            folder / pic['path']), 'selected': pic['selected']} for pic in obj['pics']]}) for obj in raw_data]
         try:
-            self.data = self.converter(
+            data = self.converter(
                 self.form, data) if self.converter else data
         except ValidationError as e:
             return None, str(e)
         for v in self.validators:
             try:
-                v(self.form, self.data)
+                v(self.form, data)
             except ValidationError as e:
                 return None, str(e)
-        return self.data, None
+        return data, None
 
     def get_layout(self) -> WidgetAttributesType:
         return {
@@ -9,6 +9,7 @@ import stringcase
 
 
 class SelectWidget:
+    __slots__ = ('form', 'name', 'col', 'default', 'options', '_options_obj', '_options_map', 'label', 'validators', 'converter')
 
     def __init__(self, form: 'BaseWebForm',
                  name: str,
@@ -24,12 +25,13 @@ class SelectWidget:
         self.default = default
         self.options = options
         self._options_obj: list[ModelListItem]|None = None
+        self._options_map: dict[str, ModelListItem]|None = None
         self.label = label or stringcase.capitalcase(name)
         self.validators = validators
         self.converter = converter
 
     @staticmethod
-    def save_widget_assets(widget_folder: Path, files: list[FileType]) -> Any:
+    def save_widget_assets(widget_folder: Path, files: list[FileType], append: bool = False) -> Any:
         pass
 
     def get_update_data(self, payload: Any) -> Any:
@@ -46,22 +48,39 @@ class SelectWidget:
             raise Exception("There is no options defined")
         return self._options_obj
 
+    @property
+    def options_map(self) -> dict[str, ModelListItem]:
+        """Options by key"""
+        if self._options_map is None:
+            if isinstance(self.options, str):
+                self._options_map = self.form.report_writer.get_list_map(self.options)
+            else:
+                # Widgets are shared between threads, the map is only published when complete
+                options_map: dict[str, ModelListItem] = {}
+                for item in self.options_obj:
+                    options_map.setdefault(item['key'], item)
+                self._options_map = options_map
+        return self._options_map
+
     def _convert_item_list(self, item) -> ModelListItem:
         if isinstance(item, str):
             return {'key': item, 'value': item}
         return item
 
     def convert_data(self, raw_data: Any) -> Tuple[Any, ErrorsType]:
+        # The value of a known option comes from the model list
+        option = self.options_map.get(raw_data.get('key'))
+        value = option['value'] if option is not None else raw_data['value']
         try:
-            self.data = self.converter(self.form, raw_data['value']) if self.converter else raw_data['value']
+            data = self.converter(self.form, value) if self.converter else value
         except ValidationError as e:
             return None, str(e)
         for v in self.validators:
             try:
-                v(self.form, self.data)
+                v(self.form, data)
             except ValidationError as e:
                 return None, str(e)
-        return self.data, None
+        return data, None
 
 
 
@@ -81,8 +100,4 @@ class SelectWidget:
         }
 
     def get_default_data(self) -> Any:
-        for item in self.options_obj:
-            if item['key'] == self.default:
-                return item
-        else:
-            return self.options_obj[0]
+        return self.options_map.get(self.default) or self.options_obj[0]
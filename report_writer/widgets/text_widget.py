@@ -4,9 +4,11 @@ if TYPE_CHECKING:
     from report_writer.base_web_form import BaseWebForm
 from report_writer.types import ConverterType, ErrorsType, FileType, ValidatorType, WidgetAttributesType, ValidationError
 import stringcase
+from report_writer.widgets.column import convert_text_column
 
 
 class TextWidget:
+    __slots__ = ('form', 'name', 'col', 'default', 'placeholder', 'required', 'label', 'validators', 'converter')
 
     def __init__(self, form: 'BaseWebForm',
                  name: str,
@@ -27,7 +29,7 @@ class TextWidget:
         self.converter = converter
 
     @staticmethod
-    def save_widget_assets(widget_folder: Path, files: list[FileType]) -> Any:
+    def save_widget_assets(widget_folder: Path, files: list[FileType], append: bool = False) -> Any:
         pass
 
     def get_update_data(self, payload: Any) -> Any:
@@ -38,15 +40,19 @@ class TextWidget:
         if text == "" and self.required:
             return None, "Campo obrigatório"
         try:
-            self.data = self.converter(self.form, text) if self.converter else text
+            data = self.converter(self.form, text) if self.converter else text
         except ValidationError as e:
             return None, str(e)
         for v in self.validators:
             try:
-                v(self.form, self.data)
+                v(self.form, data)
             except ValidationError as e:
                 return None, str(e)
-        return self.data, None
+        return data, None
+
+    def convert_many(self, raw_values: list[Any]) -> Tuple[list[Any], dict[int, str]]:
+        """convert_data for the values of this field in all items of an array"""
+        return convert_text_column(self.form, raw_values, self.required, self.converter, self.validators)
 
     def get_layout(self) -> WidgetAttributesType:
         return {
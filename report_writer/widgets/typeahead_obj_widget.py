@@ -7,6 +7,7 @@ import stringcase
 
 
 class TypeAheadObjWidget:
+    __slots__ = ('form', 'name', 'options', 'ajax', 'col', 'default', 'placeholder', 'label', 'validators', 'converter', 'list_name')
 
     def __init__(self, form: 'BaseWebForm',
                  name: str,
@@ -30,7 +31,7 @@ class TypeAheadObjWidget:
         self.list_name: str = str(self.options) if self.ajax else ""
 
     @staticmethod
-    def save_widget_assets(widget_folder: Path, files: list[FileType]) -> Any:
+    def save_widget_assets(widget_folder: Path, files: list[FileType], append: bool = False) -> Any:
         pass
 
     def get_update_data(self, payload: Any) -> Any:
@@ -40,15 +41,15 @@ class TypeAheadObjWidget:
         if raw_data is None:
             return None, "Opção inválida"
         try:
-            self.data = self.converter(self.form, raw_data['value']) if self.converter else raw_data['value']
+            data = self.converter(self.form, raw_data['value']) if self.converter else raw_data['value']
         except ValidationError as e:
             return None, str(e)
         for v in self.validators:
             try:
-                v(self.form, self.data)
+                v(self.form, data)
             except ValidationError as e:
                 return None, str(e)
-        return self.data, None
+        return data, None
 
     def _convert_item_list(self, item) -> ModelListItem:
         if isinstance(item, str):
@@ -1,10 +1,14 @@
 from __future__ import absolute_import
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import IO, Union
+from typing import IO, Any, Callable, Union
 import os
+import threading
 import zipfile
 import shutil
+from report_writer import config
 from report_writer.config import TEMPFOLDER
+from report_writer.types import ValidationError
 from uuid import uuid4
 
 
@@ -52,3 +56,94 @@ def unzip_file(
     with zipfile.ZipFile(file) as zip_ref:
         zip_ref.extractall(str(dest))
     return dest
+
+
+class _SizeBudget:
+    """Bytes the threads extracting an archive may still write, shared between them"""
+
+    def __init__(self, limit: int) -> None:
+        self.remaining = limit
+        self._lock = threading.Lock()
+
+    def take(self, size: int) -> None:
+        with self._lock:
+            self.remaining -= size
+            if self.remaining < 0:
+                raise ValidationError("O arquivo zip excede o tamanho máximo permitido")
+
+
+def _copy_limited(src: IO[bytes], dst: IO[bytes], budget: _SizeBudget) -> None:
+    while True:
+        chunk = src.read(1024 * 1024)
+        if not chunk:
+            return
+        budget.take(len(chunk))
+        dst.write(chunk)
+
+
+def _extract_entries(zip_path: Path, entries: list[tuple[str, Path]], budget: _SizeBudget,
+                     on_extracted: Callable[[Path], Any] | None) -> None:
+    with zipfile.ZipFile(zip_path) as zip_ref:
+        for name, dest in entries:
+            # "x" never overwrites a file, the names were already made unique
+            with zip_ref.open(name) as src, dest.open("xb") as dst:
+                _copy_limited(src, dst, budget)
+            if on_extracted is not None:
+                on_extracted(dest)
+
+
+def extract_flat(file: IO[bytes], dest: Path | str,
+                 max_entries: int | None = None,
+                 max_size: int | None = None,
+                 workers: int | None = None,
+                 on_extracted: Callable[[Path], Any] | None = None) -> list[Path]:
+    """Extracts the files of a zip stream directly inside dest, ignoring the folders of the archive.
+    The upload is streamed to a temporary file and the entries are extracted by a pool of threads,
+    each one calling on_extracted with the path of the files it extracted.
+    Files with a name already used in dest or in the archive get a suffix.
+    Raises ValidationError if the archive has more than max_entries files or more than max_size
+    bytes uncompressed. Returns the paths of the extracted files."""
+    max_entries = max_entries or config.ZIP_MAX_ENTRIES
+    max_size = max_size or config.ZIP_MAX_SIZE
+    workers = workers or config.ZIP_WORKERS
+    dest = Path(dest)
+    dest.mkdir(parents=True, exist_ok=True)
+    zip_path = TEMPFOLDER / f"{uuid4()}.zip"
+    try:
+        with zip_path.open("wb") as f:
+            shutil.copyfileobj(file, f, 1024 * 1024)
+        try:
+            with zipfile.ZipFile(zip_path) as zip_ref:
+                infos = [info for info in zip_ref.infolist() if not info.is_dir()]
+        except zipfile.BadZipFile:
+            raise ValidationError("Arquivo zip inválido")
+        entries: list[tuple[str, Path]] = []
+        used: set[str] = {entry.name.lower() for entry in dest.iterdir()}
+        for info in infos:
+            name = Path(info.filename).name
+            if not name or name.startswith(".") or info.filename.startswith("__MACOSX/"):
+                continue
+            # Files with the same name in different folders of the archive or already in dest
+            # get a suffix
+            stem, suffix, i = Path(name).stem, Path(name).suffix, 1
+            while name.lower() in used:
+                name = f"{stem}_{i}{suffix}"
+                i += 1
+            used.add(name.lower())
+            entries.append((info.filename, dest / name))
+        if len(entries) > max_entries:
+            raise ValidationError(f"O arquivo zip possui mais de {max_entries} arquivos")
+        if sum(info.file_size for info in infos) > max_size:
+            raise ValidationError("O arquivo zip excede o tamanho máximo permitido")
+        # Each thread has its own handle and all of them take from the same size limit, the
+        # declared sizes were already checked above, so this only stops archives that lie about them
+        budget = _SizeBudget(max_size)
+        chunks = [entries[i::workers] for i in range(workers) if entries[i::workers]]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_extract_entries, zip_path, chunk, budget, on_extracted)
+                       for chunk in chunks]
+            for future in futures:
+                future.result()
+        return [path for _, path in entries]
+    finally:
+        zip_path.unlink(missing_ok=True)
@@ -1,3 +1,4 @@
+from pathlib import Path
 from report_writer import __version__
 from report_writer import ReportWriter
 import pytest
@@ -9,3 +10,249 @@ def test_version():
 def test_form():
     rw = ReportWriter("./models")
 
+
+
+def test_module_model_registry():
+    rw = ReportWriter("./models", model_name="example")
+    rw2 = ReportWriter("./models", model_name="example")
+    assert rw.current_module_model is rw2.current_module_model
+
+
+def test_objects_from_pics_natural_order(tmp_path):
+    from report_writer.pics_analyzer import get_objects_from_pics
+    for name in ["ap1_10.jpg", "ap1_2.jpg", "ap1_1.jpg", "ap10_1.jpg", "ap2_1.jpg", "_ignorar.jpg"]:
+        (tmp_path / name).touch()
+    objects = get_objects_from_pics(tmp_path)
+    assert objects.alias == "ap"
+    assert [obj.name for obj in objects.objects] == ["1", "2", "10"]
+    assert [Path(p).name for p in objects.objects[0].pics] == ["ap1_1.jpg", "ap1_2.jpg", "ap1_10.jpg"]
+
+
+def test_get_list_cached():
+    rw = ReportWriter("./models", model_name="example")
+    items = rw.get_list("cidades")
+    assert rw.get_list("cidades") is items
+    assert rw.get_list_map("cidades")[items[0]['key']] == items[0]
+    assert rw.get_list("nao_existe") == []
+
+
+def test_form_schema_shared():
+    rw = ReportWriter("./models", model_name="example")
+    rw2 = ReportWriter("./models", model_name="example")
+    rw.get_form_layout()
+    rw2.get_form_layout()
+    assert rw.current_module_model.cache["form_schema"] is rw2.current_module_model.cache["form_schema"]
+
+
+def test_subdoc_keeps_images_passed_by_argument(tmp_path):
+    from docx import Document
+    from docx.oxml.ns import qn
+    from docx.shared import Mm
+    from docxtpl import DocxTemplate, InlineImage
+    from jinja2 import Environment
+    from PIL import Image
+    from report_writer.doc_handler.subdoc.subdoc import add_subdoc_from_template
+    red, blue = tmp_path / "red.png", tmp_path / "blue.png"
+    Image.new("RGB", (8, 8), "red").save(red)
+    Image.new("RGB", (8, 8), "blue").save(blue)
+    sub = Document()
+    sub.add_picture(str(red))
+    sub.add_paragraph("{{ foto }}")
+    sub.save(tmp_path / "sub.docx")
+    main = Document()
+    main.add_paragraph("{{p subdoc(sub_path, foto=image(blue_path)) }}")
+    main.save(tmp_path / "main.docx")
+
+    tpl = DocxTemplate(str(tmp_path / "main.docx"))
+    jinja_env = Environment()
+    jinja_env.globals['subdoc'] = lambda template, **kargs: add_subdoc_from_template(tpl, template, kargs)
+    jinja_env.globals['image'] = lambda path: InlineImage(tpl, path, width=Mm(10))
+    tpl.render({'sub_path': str(tmp_path / "sub.docx"), 'blue_path': str(blue)}, jinja_env)
+    rels = tpl.docx.part.rels
+    blobs = [rels[blip.get(qn('r:embed'))].target_part.blob for blip in tpl.docx.element.body.xpath('.//a:blip')]
+    assert blobs == [red.read_bytes(), blue.read_bytes()]
+
+
+def test_list_items_without_key(tmp_path):
+    from report_writer.model_lists import ParsedList
+    path = tmp_path / "itens.json"
+    path.write_text('[{"key": "a", "value": 1}, {"value": 2}]', encoding="utf-8")
+    parsed = ParsedList(path)
+    assert parsed.items == [{'key': "a", 'value': 1}, {'value': 2}]
+    assert parsed.by_key == {"a": {'key': "a", 'value': 1}}
+
+
+def test_array_widget_column_conversion_matches_rows():
+    from report_writer.types import ValidationError
+    from report_writer.web_converters import CpfConverter, DateConverter, FloatConverter, IntConverter
+    from report_writer.widgets.array_widget import ArrayWidget
+    from report_writer.widgets.composite_widget import CompositeWidget
+    from report_writer.widgets.text_widget import TextWidget
+
+    def positive(form, value):
+        if value <= 0:
+            raise ValidationError("Deve ser positivo")
+    codes = {"a": 1}
+    widgets = [
+        [TextWidget(None, "nome", required=True), TextWidget(None, "data", converter=DateConverter())],
+        [TextWidget(None, "valor", converter=FloatConverter()), TextWidget(None, "qtd", converter=IntConverter(), validators=[positive])],
+        [TextWidget(None, "cpf", converter=CpfConverter()), TextWidget(None, "codigo", converter=lambda form, value: codes[value])],
+    ]
+    items = [
+        {"nome": "A", "data": "01/02/2021", "valor": "1,5", "qtd": "3", "cpf": "529.982.247-25", "codigo": "a"},
+        {"nome": " ", "data": "31/02/2021", "valor": "x", "qtd": "-1", "cpf": "111", "codigo": "b"},
+        {"data": "1/2/2021", "valor": "2", "qtd": "3", "cpf": "529.982.247-25", "codigo": "a"},
+        {"nome": "B", "data": "2021-01-01", "valor": "1,5", "qtd": "0", "cpf": "", "codigo": "a"},
+    ]
+    data, errors = ArrayWidget(None, "itens", widgets).convert_data(items)
+    composite = CompositeWidget(widgets)
+    rows = [composite.convert_data(item) for item in items]
+    assert data == [row[0] for row in rows]
+    assert errors == {i: e for i, (_, e) in enumerate(rows) if e}
+    assert errors[1]['codigo'] == "missing field"
+
+
+def _zip_bytes(files: dict[str, bytes]):
+    import io
+    import zipfile
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as z:
+        for name, content in files.items():
+            z.writestr(name, content)
+    buf.seek(0)
+    return buf
+
+
+def _folder_contents(folder: Path) -> dict[str, bytes]:
+    return {entry.name: entry.read_bytes() for entry in folder.iterdir() if entry.is_file()}
+
+
+def test_zip_upload_limits(tmp_path, monkeypatch):
+    import zipfile
+    from report_writer.types import ValidationError
+    from report_writer.zipmodel import extract_flat
+    files = {f"{i}.jpg": b"x" * 1000 for i in range(4)}
+    with pytest.raises(ValidationError):
+        extract_flat(_zip_bytes(files), tmp_path / "entries", max_entries=3)
+    with pytest.raises(ValidationError):
+        extract_flat(_zip_bytes(files), tmp_path / "size", max_size=3500)
+    # An archive that lies about its sizes is stopped by the limit shared by all threads
+    infolist = zipfile.ZipFile.infolist
+
+    def lying_infolist(self):
+        infos = infolist(self)
+        for info in infos:
+            info.file_size = 0
+        return infos
+    monkeypatch.setattr(zipfile.ZipFile, "infolist", lying_infolist)
+    with pytest.raises(ValidationError):
+        extract_flat(_zip_bytes(files), tmp_path / "lying", max_size=2500, workers=4)
+
+
+def test_zip_upload_names(tmp_path):
+    from report_writer.zipmodel import extract_flat
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    (dest / "a.jpg").write_bytes(b"existing")
+    extract_flat(_zip_bytes({"a.jpg": b"1", "sub/a.jpg": b"2", "__MACOSX/._b.jpg": b"m", ".hidden": b"h"}), dest)
+    assert _folder_contents(dest) == {"a.jpg": b"existing", "a_1.jpg": b"1", "a_2.jpg": b"2"}
+
+
+def test_objects_pics_upload_modes(tmp_path):
+    import io
+    from report_writer.types import FileType, ValidationError
+    from report_writer.widgets.objects_pics_widget import ObjectsPicsWidget
+    folder = tmp_path / "widgets" / "fotos"
+    ObjectsPicsWidget.save_widget_assets(folder, [FileType(io.BytesIO(b"a"), "a.jpg"), FileType(io.BytesIO(b"b"), "b.jpg")])
+    # An invalid upload keeps the pictures saved before
+    with pytest.raises(ValidationError):
+        ObjectsPicsWidget.save_widget_assets(folder, [FileType(io.BytesIO(b"not a zip"), "fotos.zip")])
+    assert _folder_contents(folder) == {"a.jpg": b"a", "b.jpg": b"b"}
+    assert [entry.name for entry in folder.parent.iterdir()] == ["fotos"]
+    # Append skips the pictures already saved and renames new ones with a name in use
+    data = ObjectsPicsWidget.save_widget_assets(folder, [
+        FileType(io.BytesIO(b"a"), "copia.jpg"),
+        FileType(_zip_bytes({"b.jpg": b"new b", "c.jpg": b"c"}), "fotos.zip")], append=True)
+    assert [pic['path'] for pic in data[0]['pics']] == ["a.jpg", "b.jpg", "b_1.jpg", "c.jpg"]
+    assert _folder_contents(folder)["b_1.jpg"] == b"new b"
+    # Replace keeps only the upload, files with the same name don't overwrite each other
+    ObjectsPicsWidget.save_widget_assets(folder, [
+        FileType(io.BytesIO(b"plain"), "d.jpg"), FileType(_zip_bytes({"d.jpg": b"zipped"}), "fotos.zip")])
+    assert _folder_contents(folder) == {"d.jpg": b"plain", "d_1.jpg": b"zipped"}
+
+
+@pytest.fixture
+def lists_db(tmp_path, monkeypatch):
+    from report_writer.api.database import repo
+    from report_writer.api.database.db import DB
+    database = DB(f"sqlite:///{tmp_path / 'lists.db'}")
+    database.init_db()
+    monkeypatch.setattr(repo, "db", database)
+    repo.search_cache.clear()
+    yield database
+    repo.search_cache.clear()
+    database.engine.dispose()
+
+
+CIDADES = [
+    {'key': "Goiânia", 'value': "GO"}, {'key': "Aparecida de Goiânia", 'value': "GO"},
+    {'key': "Goiás", 'value': "GO"}, {'key': "São Paulo", 'value': "SP"},
+    {'key': "Santo André", 'value': "SP"}, {'value': "sem chave"},
+]
+
+
+def _keys(items: list[dict]) -> list[str]:
+    return [item['key'] for item in items]
+
+
+def test_search_list_items(lists_db):
+    from report_writer.api.database import repo
+    repo.sync_lists([("m", "cidades", CIDADES, "h1")], [])
+    # Items that start with the term come first, then the ones that contain it
+    assert _keys(repo.search_list_items("m", "cidades", "goi")) == ["Goiânia", "Goiás", "Aparecida de Goiânia"]
+    assert _keys(repo.search_list_items("m", "cidades", "GOIANIA", limit=1)) == ["Goiânia"]
+    assert _keys(repo.search_list_items("m", "cidades", "sao")) == ["São Paulo"]
+    assert _keys(repo.search_list_items("m", "cidades", "andre")) == ["Santo André"]
+    assert repo.search_list_items("m", "cidades", "xyz") == []
+    assert len(repo.search_list_items("m", "cidades", "")) == 5
+
+
+def test_search_list_items_without_index(lists_db):
+    import sqlalchemy as sa
+    from report_writer.api.database import repo
+    from report_writer.api.database.models import SQLITE_SEARCH_TRIGGERS
+    with lists_db.engine.begin() as conn:
+        for name in SQLITE_SEARCH_TRIGGERS:
+            conn.execute(sa.text(f"DROP TRIGGER {name}"))
+        conn.execute(sa.text("DROP TABLE item_list_fts"))
+    repo.sync_lists([("m", "cidades", CIDADES, "h1")], [])
+    assert not lists_db.has_search_index()
+    assert _keys(repo.search_list_items("m", "cidades", "goi")) == ["Goiânia", "Goiás", "Aparecida de Goiânia"]
+    assert _keys(repo.search_list_items("m", "cidades", "ia")) == ["Aparecida de Goiânia", "Goiânia", "Goiás"]
+
+
+def test_search_cache_follows_the_database(lists_db):
+    import sqlalchemy as sa
+    from report_writer.api.database import repo
+    repo.sync_lists([("m", "cidades", CIDADES, "h1")], [])
+    assert _keys(repo.search_list_items("m", "cidades", "santo")) == ["Santo André"]
+    # A sync made by another process only changes the database
+    with lists_db.engine.begin() as conn:
+        conn.execute(sa.text("UPDATE item_list SET key = 'Santos', search_key = 'santos' WHERE key = 'Santo André'"))
+        repo._bump_lists_version(conn)
+    assert _keys(repo.search_list_items("m", "cidades", "santo")) == ["Santos"]
+    repo.sync_lists([], [("m", "cidades")])
+    assert repo.search_list_items("m", "cidades", "santo") == []
+
+
+def test_search_list_items_regexp(lists_db):
+    from report_writer.api.app import app
+    from report_writer.api.database import repo
+    repo.sync_lists([("m", "cidades", CIDADES, "h1")], [])
+    client = app.test_client()
+    resp = client.get("/api/list-items/m/cidades?mode=regex&query=^s.o ")
+    assert resp.status_code == 200
+    assert _keys(resp.json) == ["São Paulo"]
+    resp = client.get("/api/list-items/m/cidades?mode=regex&query=(goi")
+    assert resp.status_code == 400
+    assert resp.json.startswith("Expressão regular inválida")